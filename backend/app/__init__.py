@@ -1,9 +1,14 @@
-from flask import Flask
+import time
+from flask import Flask, request, Response
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
 from app.models import initialize_db
 from app.routes import register_blueprints
+from app.utils.helpers import on_file_close
+from app.services import metrics
+from app.services.proposal_generation_service import ProposalGenerationService
+from app.services.render_job_service import RenderJobService
 
 def create_app():
     app = Flask(__name__)
@@ -22,6 +27,38 @@ def create_app():
     # Register blueprints
     register_blueprints(app)
     
+    # Take over proposal generations and render jobs abandoned by a stopped process
+    ProposalGenerationService.resume_pending()
+    RenderJobService.resume_pending()
+    
+    # Per-phase render timings for Server-Timing and the metrics histograms
+    @app.before_request
+    def start_render_timing():
+        metrics.start_collection()
+    
+    @app.after_request
+    def add_server_timing(response):
+        timing = metrics.server_timing(metrics.stop_collection())
+        if timing:
+            response.headers['Server-Timing'] = timing
+            sent_at = time.perf_counter()
+            record_send = lambda: metrics.observe(metrics.PHASE_METRIC, time.perf_counter() - sent_at, phase='send')
+            document = getattr(response, 'document', None)
+            if response.direct_passthrough and document is not None:
+                # File bodies bypass call_on_close; wrapping the body would hide the
+                # server's file wrapper and with it sendfile, so hook the file instead
+                on_file_close(document, record_send)
+            else:
+                response.call_on_close(record_send)
+        return response
+    
+    # Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token
+    @app.route('/metrics')
+    def render_metrics():
+        if Config.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {Config.METRICS_TOKEN}':
+            return {'error': 'Unauthorized'}, 401
+        return Response(metrics.exposition(), mimetype='text/plain; version=0.0.4')
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
@@ -0,0 +1,18 @@
+from mongoengine import Document, StringField, FloatField, DictField, DateTimeField
+from datetime import datetime
+
+class GeneratedTemplate(Document):
+    key = StringField(required=True, unique=True)  # Hash of normalized description, model, prompt version, temperature
+    model = StringField(required=True)
+    prompt_version = StringField(required=True)
+    temperature = FloatField(required=True)
+    json_content = DictField(required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField(required=True)  # Removed by MongoDB TTL monitor after this time
+
+    meta = {
+        'collection': 'generated_templates',
+        'indexes': [
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
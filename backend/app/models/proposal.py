@@ -1,8 +1,10 @@
-from mongoengine import Document, StringField, DictField, ReferenceField, IntField, DateTimeField
+from mongoengine import Document, ValidationError, StringField, DictField, ReferenceField, IntField, DateTimeField
 from enum import Enum
 from datetime import datetime
 
 class ProposalStatus(Enum):
+    GENERATING = 'generating'
+    GENERATION_FAILED = 'generation_failed'
     DRAFT = 'draft'
     SUBMITTED = 'submitted'
     UNDER_REVIEW = 'under_review'
@@ -13,7 +15,7 @@ class ProposalStatus(Enum):
 class Proposal(Document):
     title = StringField(required=True, max_length=200)
     project_description = StringField(required=True)
-    json_content = DictField(required=True)  # GROQ-generated JSON template
+    json_content = DictField()  # GROQ-generated JSON template; empty until generation finishes
     status = StringField(
         required=True,
         choices=[status.value for status in ProposalStatus],
@@ -21,9 +23,17 @@ class Proposal(Document):
     )
     business_developer = ReferenceField('User', required=True, reverse_delete_rule=2)  # CASCADE
     current_version = IntField(default=1, min_value=1)
+    generation_error = StringField()  # Why generation failed, for generation_failed proposals
+    generation_lease_until = DateTimeField()  # Until when a process owns a generating proposal
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
 
+    def clean(self):
+        """Only proposals still being generated (or whose generation failed) may lack content"""
+        pending = (ProposalStatus.GENERATING.value, ProposalStatus.GENERATION_FAILED.value)
+        if not self.json_content and self.status not in pending:
+            raise ValidationError('json_content is required once generation has finished')
+
     def save(self, *args, **kwargs):
         """Override save to update timestamp"""
         if not self.created_at:
@@ -42,6 +52,7 @@ class Proposal(Document):
             'business_developer': str(self.business_developer.id) if self.business_developer else None,
             'business_developer_username': self.business_developer.username if self.business_developer else None,
             'current_version': self.current_version,
+            'generation_error': self.generation_error,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -0,0 +1,67 @@
+from mongoengine import Document, ReferenceField, StringField, ListField, DictField, DateTimeField
+from enum import Enum
+from datetime import datetime
+
+class RenderJobStatus(Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+class RenderJob(Document):
+    proposal = ReferenceField('Proposal', required=True, reverse_delete_rule=2)  # CASCADE
+    requested_by = ReferenceField('User', required=True, reverse_delete_rule=2)  # CASCADE
+    formats = ListField(StringField(choices=['pdf', 'docx']), required=True)
+    theme = StringField(default='default')
+    status = StringField(
+        required=True,
+        choices=[status.value for status in RenderJobStatus],
+        default=RenderJobStatus.QUEUED.value
+    )
+    results = DictField()  # format -> {'size': bytes}; the bytes are kept as RenderJobResult
+    error = StringField()
+    lease_until = DateTimeField()  # Until when a process owns a queued or running job
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField(required=True)  # Removed by MongoDB TTL monitor after this time
+
+    def save(self, *args, **kwargs):
+        """Override save to update timestamp"""
+        if not self.created_at:
+            self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        return super(RenderJob, self).save(*args, **kwargs)
+
+    @property
+    def is_finished(self):
+        return self.status in (RenderJobStatus.COMPLETED.value, RenderJobStatus.FAILED.value)
+
+    def to_dict(self):
+        """Convert render job to dictionary representation"""
+        return {
+            'id': str(self.id),
+            'proposal_id': str(self.proposal.id) if self.proposal else None,
+            'formats': list(self.formats),
+            'theme': self.theme,
+            'status': self.status,
+            'results': {
+                fmt: {
+                    'size': result.get('size'),
+                    'download_url': f'/api/documents/render-jobs/{self.id}/download/{fmt}'
+                }
+                for fmt, result in (self.results or {}).items()
+            },
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    meta = {
+        'collection': 'render_jobs',
+        'indexes': [
+            'requested_by',
+            'status',
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
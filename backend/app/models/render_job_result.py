@@ -0,0 +1,18 @@
+from mongoengine import Document, ReferenceField, StringField, IntField, DateTimeField, FileField
+from datetime import datetime
+
+class RenderJobResult(Document):
+    job = ReferenceField('RenderJob', required=True)
+    format = StringField(required=True, choices=['pdf', 'docx'])
+    file = FileField(collection_name='render_job_results_fs')
+    size = IntField(default=0)
+    created_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField(required=True)  # Deleted with its file by RenderJobService.purge_expired()
+
+    meta = {
+        'collection': 'render_job_results',
+        'indexes': [
+            {'fields': ('job', 'format'), 'unique': True},
+            'expires_at'
+        ]
+    }
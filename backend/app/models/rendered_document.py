@@ -0,0 +1,23 @@
+from mongoengine import Document, ReferenceField, StringField, IntField, DateTimeField, FileField
+from datetime import datetime
+
+class RenderedDocument(Document):
+    proposal = ReferenceField('Proposal', required=True, reverse_delete_rule=2)  # CASCADE
+    version = IntField(required=True, min_value=1)
+    format = StringField(required=True, choices=['pdf', 'docx'])
+    content_key = StringField(required=True)  # Render cache key of the content that was rendered
+    file = FileField(collection_name='rendered_documents_fs')
+    size = IntField(default=0)
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    @classmethod
+    def get_for_proposal(cls, proposal, fmt):
+        """Get the stored artifact for the proposal's current version"""
+        return cls.objects(proposal=proposal, version=proposal.current_version, format=fmt).first()
+
+    meta = {
+        'collection': 'rendered_documents',
+        'indexes': [
+            {'fields': ('proposal', 'version', 'format'), 'unique': True}
+        ]
+    }
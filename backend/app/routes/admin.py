@@ -1,26 +1,51 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User, UserRole
 from app.models.proposal import Proposal, ProposalStatus
 from app.models.review import Review
 from app.services.auth_service import require_roles, get_current_user
+from app.utils.helpers import proposal_etag, collection_etag, not_modified, add_validators
 from app.services.groq_service import GroqService
-from datetime import datetime
+from app.services.artifact_service import ArtifactService
+from app.services.export_service import ExportService, EXPORT_EXTENSIONS
+from mongoengine.queryset.visitor import Q
+from bson import ObjectId
+from datetime import datetime, timedelta
 import secrets
 import string
 
 admin_bp = Blueprint('admin', __name__)
 
+def _filter_proposals(args):
+    """Proposal queryset filtered by the status, search and bd query parameters"""
+    query = {}
+    status = args.get('status')
+    if status and status in [s.value for s in ProposalStatus]:
+        query['status'] = status
+    
+    bd_id = args.get('bd', '').strip()
+    if bd_id:
+        if not ObjectId.is_valid(bd_id):
+            raise ValueError(f'Invalid business developer id: {bd_id}')
+        query['business_developer'] = bd_id
+    
+    search = args.get('search', '').strip()
+    if search:
+        # Search in title and project description
+        return Proposal.objects(
+            Q(title__icontains=search) | Q(project_description__icontains=search),
+            **query
+        )
+    return Proposal.objects(**query)
+
 @admin_bp.route('/proposals', methods=['GET'])
 @jwt_required()
 @require_roles([UserRole.ADMIN])
 def get_proposals():
     """Get all proposals with filtering and pagination"""
     try:
-        status = request.args.get('status')
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
-        search = request.args.get('search', '').strip()
         
         # Validate pagination
         if page < 1:
@@ -28,29 +53,23 @@ def get_proposals():
         if limit < 1 or limit > 100:
             limit = 10
         
-        # Build query
-        query = {}
-        if status and status in [s.value for s in ProposalStatus]:
-            query['status'] = status
-        
-        if search:
-            # Search in title and project description
-            query['$or'] = [
-                {'title__icontains': search},
-                {'project_description__icontains': search}
-            ]
-        
         # Get proposals with pagination
         skip = (page - 1) * limit
-        proposals = Proposal.objects(**query).order_by('-created_at').skip(skip).limit(limit)
-        total = Proposal.objects(**query).count()
+        proposals = _filter_proposals(request.args).order_by('-created_at').skip(skip).limit(limit)
+        total = _filter_proposals(request.args).count()
+        
+        # Validate against ids and versions only, before loading full documents
+        etag = collection_etag(proposals.clone().only('id', 'current_version', 'updated_at'), total, page, limit)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
         # Calculate pagination info
         total_pages = (total + limit - 1) // limit
         has_next = page < total_pages
         has_prev = page > 1
         
-        return jsonify({
+        return add_validators(jsonify({
             'proposals': [prop.to_dict() for prop in proposals],
             'pagination': {
                 'total': total,
@@ -60,7 +79,7 @@ def get_proposals():
                 'has_next': has_next,
                 'has_prev': has_prev
             }
-        }), 200
+        }), etag)
         
     except ValueError as e:
         return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
@@ -77,13 +96,19 @@ def get_proposal_details(proposal_id):
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        # Reviews are only written together with their proposal, so its version covers them
+        etag = proposal_etag(proposal, 'details')
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
         # Get reviews for this proposal
         reviews = Review.objects(proposal=proposal).order_by('-created_at')
         
-        return jsonify({
+        return add_validators(jsonify({
             'proposal': proposal.to_dict(),
             'reviews': [review.to_dict() for review in reviews]
-        }), 200
+        }), etag, proposal.updated_at)
         
     except Exception as e:
         return jsonify({'error': f'Failed to get proposal details: {str(e)}'}), 500
@@ -139,6 +164,10 @@ def review_proposal(proposal_id):
         proposal.updated_at = datetime.utcnow()
         proposal.save()
         
+        # Render final documents in the background so downloads are instant
+        if proposal.status == ProposalStatus.APPROVED.value:
+            ArtifactService.schedule_prerender(proposal)
+        
         return jsonify({
             'message': 'Review submitted successfully',
             'review': review.to_dict(),
@@ -148,6 +177,45 @@ def review_proposal(proposal_id):
     except Exception as e:
         return jsonify({'error': f'Failed to submit review: {str(e)}'}), 500
 
+@admin_bp.route('/proposals/export', methods=['GET'])
+@jwt_required()
+@require_roles([UserRole.ADMIN])
+def export_proposals():
+    """Stream a ZIP archive of rendered proposals matching the listing filters"""
+    try:
+        formats = [fmt.strip() for fmt in request.args.get('format', 'pdf').split(',') if fmt.strip()]
+        if not formats or not all(fmt in EXPORT_EXTENSIONS for fmt in formats):
+            return jsonify({'error': f'Invalid format. Must be any of: {list(EXPORT_EXTENSIONS)}'}), 400
+        
+        proposals = _filter_proposals(request.args)
+        
+        # Optional created_at date range (ISO dates, inclusive)
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        if date_from:
+            proposals = proposals.filter(created_at__gte=datetime.fromisoformat(date_from))
+        if date_to:
+            end = datetime.fromisoformat(date_to)
+            if len(date_to) == 10:  # Plain date: include the whole day
+                end = end + timedelta(days=1)
+                proposals = proposals.filter(created_at__lt=end)
+            else:
+                proposals = proposals.filter(created_at__lte=end)
+        
+        proposals = proposals.order_by('-created_at').no_cache()
+        
+        filename = f"proposals_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
+        return Response(
+            ExportService.stream_zip(proposals, formats),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to export proposals: {str(e)}'}), 500
+
 @admin_bp.route('/users/bd', methods=['POST'])
 @jwt_required()
 @require_roles([UserRole.ADMIN])
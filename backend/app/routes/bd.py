@@ -1,10 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User, UserRole
 from app.models.proposal import Proposal, ProposalStatus
 from app.models.review import Review
 from app.services.auth_service import require_roles, get_current_user
-from app.services.groq_service import GroqService
+from app.utils.helpers import proposal_etag, collection_etag, not_modified, add_validators, sse_event
+from app.services.groq_service import groq_service
+from app.services.proposal_generation_service import ProposalGenerationService
 from datetime import datetime
 
 bd_bp = Blueprint('bd', __name__)
@@ -43,12 +45,18 @@ def get_my_proposals():
         proposals = Proposal.objects(**query).order_by('-created_at').skip(skip).limit(limit)
         total = Proposal.objects(**query).count()
         
+        # Validate against ids and versions only, before loading full documents
+        etag = collection_etag(proposals.clone().only('id', 'current_version', 'updated_at'), total, page, limit)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         # Calculate pagination info
         total_pages = (total + limit - 1) // limit
         has_next = page < total_pages
         has_prev = page > 1
         
-        return jsonify({
+        return add_validators(jsonify({
             'proposals': [prop.to_dict() for prop in proposals],
             'pagination': {
                 'total': total,
@@ -58,7 +66,7 @@ def get_my_proposals():
                 'has_next': has_next,
                 'has_prev': has_prev
             }
-        }), 200
+        }), etag)
         
     except ValueError as e:
         return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
@@ -77,13 +85,19 @@ def get_proposal_details(proposal_id):
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        # Reviews are only written together with their proposal, so its version covers them
+        etag = proposal_etag(proposal, 'details')
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
         # Get reviews for this proposal
         reviews = Review.objects(proposal=proposal).order_by('-created_at')
         
-        return jsonify({
+        return add_validators(jsonify({
             'proposal': proposal.to_dict(),
             'reviews': [review.to_dict() for review in reviews]
-        }), 200
+        }), etag, proposal.updated_at)
         
     except Exception as e:
         return jsonify({'error': f'Failed to get proposal details: {str(e)}'}), 500
@@ -92,63 +106,129 @@ def get_proposal_details(proposal_id):
 @jwt_required()
 @require_roles([UserRole.BUSINESS_DEVELOPER])
 def create_proposal():
-    """Create a new proposal"""
+    """
+    Create a new proposal. It is saved straight away in the generating
+    state and 202 is returned; its content is generated in the background
+    and the proposal becomes a draft (or generation_failed), which clients
+    see by polling the proposal details.
+    """
     try:
         data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
-            
-        title = data.get('title', '').strip()
-        project_description = data.get('project_description', '').strip()
-        
-        if not title or not project_description:
-            return jsonify({'error': 'Title and project description are required'}), 400
-        
-        if len(title) > 200:
-            return jsonify({'error': 'Title must be less than 200 characters'}), 400
-        
-        if len(project_description) < 50:
-            return jsonify({'error': 'Project description must be at least 50 characters'}), 400
+        error = _validate_new_proposal(data)
+        if error:
+            return jsonify({'error': error}), 400
+        title = data['title'].strip()
+        project_description = data['project_description'].strip()
         
         # Get current user
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Call GROQ API to generate JSON template
-        try:
-            groq_service = GroqService()
-            json_content = groq_service.generate_proposal_template(project_description)
-        except Exception as e:
-            print(f"GROQ service error: {e}")
-            # Use a basic template if GROQ fails
-            json_content = {
-                "introduction": "Thank you for posting this project...",
-                "understanding": "Based on your requirements...",
-                "proposed_solution": "I will deliver a comprehensive solution...",
-                "timeline": "To be discussed",
-                "budget": "Competitive pricing",
-                "why_choose_us": "Experience and dedication"
-            }
-        
         # Create proposal
         proposal = Proposal(
             title=title,
             project_description=project_description,
-            json_content=json_content,
+            json_content={},
             business_developer=user,
-            status=ProposalStatus.DRAFT.value
+            status=ProposalStatus.GENERATING.value,
+            generation_lease_until=ProposalGenerationService.new_lease()
         )
         proposal.save()
         
-        return jsonify({
-            'message': 'Proposal created successfully',
+        # Generate the JSON template with GROQ ("fresh": true skips the generation cache)
+        ProposalGenerationService.submit(proposal, fresh=bool(data.get('fresh', False)))
+        
+        response = jsonify({
+            'message': 'Proposal created; its content is being generated',
             'proposal': proposal.to_dict()
-        }), 201
+        })
+        response.headers['Location'] = url_for('bd.get_proposal_details', proposal_id=str(proposal.id))
+        return response, 202
         
     except Exception as e:
         return jsonify({'error': f'Failed to create proposal: {str(e)}'}), 500
 
+@bd_bp.route('/proposals/stream', methods=['POST'])
+@jwt_required()
+@require_roles([UserRole.BUSINESS_DEVELOPER])
+def create_proposal_stream():
+    """
+    Create a new proposal, relaying its generated sections as Server-Sent
+    Events. Emits "section" ({key, value}) as each section is generated,
+    "reset" when generation failed part-way and the sections so far should be
+    discarded, then "done" with the saved proposal or "error".
+    """
+    try:
+        data = request.get_json()
+        error = _validate_new_proposal(data)
+        if error:
+            return jsonify({'error': error}), 400
+        title = data['title'].strip()
+        project_description = data['project_description'].strip()
+        
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        fresh = bool(data.get('fresh', False))
+        
+        def events():
+            json_content = {}
+            try:
+                for kind, section in groq_service.stream_proposal_template(project_description, fresh=fresh):
+                    if kind == 'reset':
+                        json_content = {}
+                        yield sse_event('reset', {})
+                        continue
+                    key, value = section
+                    json_content[key] = value
+                    yield sse_event('section', {'key': key, 'value': value})
+                
+                # The document is only persisted once all sections are in
+                proposal = Proposal(
+                    title=title,
+                    project_description=project_description,
+                    json_content=json_content,
+                    business_developer=user,
+                    status=ProposalStatus.DRAFT.value
+                )
+                proposal.save()
+                yield sse_event('done', {
+                    'message': 'Proposal created successfully',
+                    'proposal': proposal.to_dict()
+                })
+            except Exception as e:
+                print(f"Proposal stream error: {e}")
+                yield sse_event('error', {'error': f'Failed to create proposal: {str(e)}'})
+        
+        response = Response(stream_with_context(events()), mimetype='text/event-stream')
+        response.cache_control.no_cache = True
+        response.headers['X-Accel-Buffering'] = 'no'  # Keep nginx from holding back events
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to create proposal: {str(e)}'}), 500
+
+def _validate_new_proposal(data):
+    """Error message for an invalid create request body, or None"""
+    if not data:
+        return 'No JSON data provided'
+    
+    title = data.get('title', '').strip()
+    project_description = data.get('project_description', '').strip()
+    
+    if not title or not project_description:
+        return 'Title and project description are required'
+    
+    if len(title) > 200:
+        return 'Title must be less than 200 characters'
+    
+    if len(project_description) < 50:
+        return 'Project description must be at least 50 characters'
+    
+    return None
+
 @bd_bp.route('/proposals/<proposal_id>', methods=['PUT'])
 @jwt_required()
 @require_roles([UserRole.BUSINESS_DEVELOPER])
@@ -245,10 +325,15 @@ def get_proposal_reviews(proposal_id):
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        etag = proposal_etag(proposal, 'reviews')
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
         reviews = Review.objects(proposal=proposal).order_by('-created_at')
-        return jsonify({
+        return add_validators(jsonify({
             'reviews': [review.to_dict() for review in reviews]
-        }), 200
+        }), etag, proposal.updated_at)
         
     except Exception as e:
         return jsonify({'error': f'Failed to get reviews: {str(e)}'}), 500
@@ -290,7 +375,6 @@ def revise_proposal(proposal_id):
         
         # Call GROQ API to regenerate JSON with recommendations
         try:
-            groq_service = GroqService()
             new_json = groq_service.regenerate_proposal(
                 proposal.json_content,
                 latest_review.recommendations or "",
@@ -330,6 +414,9 @@ def duplicate_proposal(proposal_id):
         if not original_proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        if not original_proposal.json_content:
+            return jsonify({'error': 'Proposal has no content to copy yet'}), 400
+        
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -356,7 +443,7 @@ def duplicate_proposal(proposal_id):
 @jwt_required()
 @require_roles([UserRole.BUSINESS_DEVELOPER])
 def delete_proposal(proposal_id):
-    """Delete a proposal (only if it's in draft status)"""
+    """Delete a proposal (only if it's a draft or its generation failed)"""
     try:
         user_id = get_jwt_identity()
         
@@ -365,7 +452,7 @@ def delete_proposal(proposal_id):
             return jsonify({'error': 'Proposal not found'}), 404
         
         # Only allow deletion of draft proposals
-        if proposal.status != ProposalStatus.DRAFT.value:
+        if proposal.status not in [ProposalStatus.DRAFT.value, ProposalStatus.GENERATION_FAILED.value]:
             return jsonify({'error': 'Only draft proposals can be deleted'}), 400
         
         # Delete associated reviews first
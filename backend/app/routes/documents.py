@@ -1,44 +1,115 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from io import BytesIO
-from app.services.document_service import DocumentService
+from bson import ObjectId
+from app.services.document_service import DocumentService, RENDERER_VERSION
+from app.services.artifact_service import ArtifactService, ARTIFACT_CONTENT_TYPES
+from app.services.render_engine import RenderQueueFull, RenderTimeout, RenderCancelled
+from app.services.live_preview import live_previews
+from app.services.render_job_service import RenderJobService
+from app.models.render_job import RenderJob, RenderJobStatus
+from app.services.render_themes import DEFAULT_THEME, theme_names
+from app.services.portfolio_service import PortfolioService
+from app.services import metrics
+from app.services.renderer_registry import get_renderer, renderer_names, negotiate_renderer
+from config import Config
 from app.models.user import User, UserRole
 from app.models.proposal import Proposal, ProposalStatus
 from app.services.auth_service import require_roles, get_current_user
+from app.utils.helpers import proposal_etag, not_modified, add_validators, send_document
 
 documents_bp = Blueprint('documents', __name__)
 
+PREVIEW_QUALITIES = ('full', 'draft')
+
+def _render_unavailable(error):
+    """Fast response when the render engine cannot take or finish a render"""
+    if isinstance(error, RenderQueueFull):
+        response = jsonify({'error': str(error)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    return jsonify({'error': str(error)}), 504
+
+def _get_accessible_proposal(proposal_id, user):
+    """Load a proposal the user may see: BDs their own, admins any"""
+    with metrics.phase('db'):
+        if user.role == UserRole.BUSINESS_DEVELOPER.value:
+            return Proposal.objects(id=proposal_id, business_developer=user.id).first()
+        return Proposal.objects(id=proposal_id).first()
+
+def _add_budget_report(response, proposal_json, document):
+    """Tell clients which render budgets cut this proposal content short, including the rendered page budget"""
+    exceeded = list(DocumentService.budget_report(proposal_json))
+    exceeded += [name for name in DocumentService.layout_budget_report(document) if name not in exceeded]
+    if exceeded:
+        response.headers['X-Render-Budget-Exceeded'] = ','.join(exceeded)
+
 @documents_bp.route('/proposals/<proposal_id>/preview/word', methods=['GET'])
 @jwt_required()
 def preview_proposal_word(proposal_id):
-    """Generate Word document preview for proposal"""
+    """Generate Word document preview for proposal (?quality=draft for a fast partial preview)"""
     try:
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Check access permissions
-        if user.role == UserRole.BUSINESS_DEVELOPER.value:
-            proposal = Proposal.objects(id=proposal_id, business_developer=user.id).first()
-        else:  # Admin can access all proposals
-            proposal = Proposal.objects(id=proposal_id).first()
+        proposal = _get_accessible_proposal(proposal_id, user)
         
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        theme = request.args.get('theme', DEFAULT_THEME)
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        quality = request.args.get('quality', 'full')
+        if quality not in PREVIEW_QUALITIES:
+            return jsonify({'error': f'Invalid quality. Must be one of: {list(PREVIEW_QUALITIES)}'}), 400
+        
+        etag = proposal_etag(proposal, 'preview', 'docx', theme, quality, RENDERER_VERSION)
+        # A draft is cut by a wall-clock layout budget, so its bytes vary between renders:
+        # it gets a weak ETag and no Last-Modified
+        draft = quality == 'draft'
+        last_modified = None if draft else proposal.updated_at
+        cached = not_modified(etag, last_modified, weak=draft)
+        if cached:
+            return cached
+        
         # Generate Word document
         try:
-            doc_buffer = DocumentService.generate_word_document(
-                proposal.json_content, 
-                proposal.title
-            )
+            if quality == 'draft':
+                # Leading sections/pages only, for fast previews while editing
+                doc_buffer, truncated = DocumentService.render_draft(
+                    'docx',
+                    proposal.json_content,
+                    proposal.title,
+                    theme=theme
+                )
+            else:
+                doc_buffer = DocumentService.render_document(
+                    'docx',
+                    proposal.json_content, 
+                    proposal.title,
+                    proposal_id=proposal.id,
+                    theme=theme
+                )
+                truncated = False
             
-            return send_file(
+            response = send_document(
                 doc_buffer,
+                etag,
+                last_modified,
+                weak=draft,
                 as_attachment=False,
                 download_name=f'{proposal.title}_preview.docx',
                 mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
             )
+            response.headers['X-Preview-Quality'] = quality
+            response.headers['X-Preview-Truncated'] = 'true' if truncated else 'false'
+            _add_budget_report(response, proposal.json_content, doc_buffer)
+            return response
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
         except Exception as e:
             return jsonify({'error': f'Failed to generate Word document: {str(e)}'}), 500
         
@@ -48,40 +119,226 @@ def preview_proposal_word(proposal_id):
 @documents_bp.route('/proposals/<proposal_id>/preview/pdf', methods=['GET'])
 @jwt_required()
 def preview_proposal_pdf(proposal_id):
-    """Generate PDF document preview for proposal"""
+    """Generate PDF document preview for proposal (?quality=draft for a fast partial preview)"""
     try:
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Check access permissions
-        if user.role == UserRole.BUSINESS_DEVELOPER.value:
-            proposal = Proposal.objects(id=proposal_id, business_developer=user.id).first()
-        else:  # Admin can access all proposals
-            proposal = Proposal.objects(id=proposal_id).first()
+        proposal = _get_accessible_proposal(proposal_id, user)
         
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
+        theme = request.args.get('theme', DEFAULT_THEME)
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        quality = request.args.get('quality', 'full')
+        if quality not in PREVIEW_QUALITIES:
+            return jsonify({'error': f'Invalid quality. Must be one of: {list(PREVIEW_QUALITIES)}'}), 400
+        
+        etag = proposal_etag(proposal, 'preview', 'pdf', theme, quality, RENDERER_VERSION)
+        # A draft is cut by a wall-clock layout budget, so its bytes vary between renders:
+        # it gets a weak ETag and no Last-Modified
+        draft = quality == 'draft'
+        last_modified = None if draft else proposal.updated_at
+        cached = not_modified(etag, last_modified, weak=draft)
+        if cached:
+            return cached
+        
         # Generate PDF document
         try:
-            pdf_buffer = DocumentService.generate_pdf_document(
-                proposal.json_content, 
-                proposal.title
-            )
+            if quality == 'draft':
+                # Leading sections/pages only, for fast previews while editing
+                pdf_buffer, truncated = DocumentService.render_draft(
+                    'pdf',
+                    proposal.json_content,
+                    proposal.title,
+                    theme=theme
+                )
+            else:
+                pdf_buffer = DocumentService.render_document(
+                    'pdf',
+                    proposal.json_content, 
+                    proposal.title,
+                    proposal_id=proposal.id,
+                    theme=theme
+                )
+                truncated = False
             
-            return send_file(
+            response = send_document(
                 pdf_buffer,
+                etag,
+                last_modified,
+                weak=draft,
                 as_attachment=False,
                 download_name=f'{proposal.title}_preview.pdf',
                 mimetype='application/pdf'
             )
+            response.headers['X-Preview-Quality'] = quality
+            response.headers['X-Preview-Truncated'] = 'true' if truncated else 'false'
+            _add_budget_report(response, proposal.json_content, pdf_buffer)
+            return response
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
         except Exception as e:
             return jsonify({'error': f'Failed to generate PDF document: {str(e)}'}), 500
         
     except Exception as e:
         return jsonify({'error': f'Document generation failed: {str(e)}'}), 500
 
+@documents_bp.route('/proposals/<proposal_id>/preview', methods=['POST'])
+@jwt_required()
+def preview_unsaved_proposal(proposal_id):
+    """
+    Render unsaved proposal content for a live editor preview without
+    persisting it. Body: {"json_content": {...}, "format": "pdf",
+    "theme": "default", "quality": "full"|"draft"}. Identical content is
+    served from the render cache; a newer preview of the same proposal by the
+    same user cancels this one, which then gets a 409.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        json_content = data.get('json_content')
+        if not json_content or not isinstance(json_content, dict):
+            return jsonify({'error': 'Valid json_content is required'}), 400
+        
+        fmt = data.get('format') or 'pdf'
+        if fmt not in renderer_names():
+            return jsonify({'error': f'Invalid format. Must be one of: {renderer_names()}'}), 400
+        renderer = get_renderer(fmt)
+        
+        theme = data.get('theme') or DEFAULT_THEME
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        quality = data.get('quality') or 'full'
+        if quality not in PREVIEW_QUALITIES:
+            return jsonify({'error': f'Invalid quality. Must be one of: {list(PREVIEW_QUALITIES)}'}), 400
+        if quality == 'draft' and fmt not in ('pdf', 'docx'):
+            return jsonify({'error': 'Draft quality is only available for pdf and docx'}), 400
+        
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        proposal = _get_accessible_proposal(proposal_id, user)
+        
+        if not proposal:
+            return jsonify({'error': 'Proposal not found'}), 404
+        
+        try:
+            with live_previews.track(user.id, proposal.id) as cancelled:
+                if quality == 'draft':
+                    buffer, truncated = DocumentService.render_draft(
+                        fmt,
+                        json_content,
+                        proposal.title,
+                        theme=theme,
+                        cancelled=cancelled
+                    )
+                else:
+                    # Not tied to the proposal id: unsaved content is cached by its hash only
+                    buffer = DocumentService.render_document(
+                        fmt,
+                        json_content,
+                        proposal.title,
+                        theme=theme,
+                        cancelled=cancelled
+                    )
+                    truncated = False
+            
+            response = send_document(
+                buffer,
+                as_attachment=False,
+                download_name=f'{proposal.title}_preview.{renderer.extension}',
+                mimetype=renderer.content_type
+            )
+            response.headers['X-Preview-Quality'] = quality
+            response.headers['X-Preview-Truncated'] = 'true' if truncated else 'false'
+            _add_budget_report(response, json_content, buffer)
+            response.cache_control.no_store = True
+            return response
+        except RenderCancelled:
+            return jsonify({'error': 'Preview superseded by a newer request'}), 409
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
+        except Exception as e:
+            return jsonify({'error': f'Failed to generate {renderer.name} preview: {str(e)}'}), 500
+        
+    except Exception as e:
+        return jsonify({'error': f'Preview generation failed: {str(e)}'}), 500
+
+@documents_bp.route('/proposals/<proposal_id>/document', methods=['GET'])
+@jwt_required()
+def get_proposal_document(proposal_id):
+    """
+    Render a proposal in any registered format, chosen by ?format= or the
+    Accept header (pdf, docx, html, markdown, text). ?download=1 sends it as
+    an attachment.
+    """
+    try:
+        fmt = request.args.get('format')
+        if fmt:
+            if fmt not in renderer_names():
+                return jsonify({'error': f'Invalid format. Must be one of: {renderer_names()}'}), 400
+            renderer = get_renderer(fmt)
+        else:
+            renderer = negotiate_renderer(request.accept_mimetypes)
+            if renderer is None:
+                return jsonify({'error': f'No acceptable format. Available: {renderer_names()}'}), 406
+        
+        theme = request.args.get('theme', DEFAULT_THEME)
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        proposal = _get_accessible_proposal(proposal_id, user)
+        
+        if not proposal:
+            return jsonify({'error': 'Proposal not found'}), 404
+        
+        etag = proposal_etag(proposal, 'document', renderer.name, theme, RENDERER_VERSION)
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            cached.vary.add('Accept')
+            return cached
+        
+        try:
+            buffer = DocumentService.render_document(
+                renderer.name,
+                proposal.json_content,
+                proposal.title,
+                proposal_id=proposal.id,
+                theme=theme
+            )
+            
+            response = send_document(
+                buffer,
+                etag,
+                proposal.updated_at,
+                as_attachment=request.args.get('download', '').lower() in ('1', 'true'),
+                download_name=f'{proposal.title}.{renderer.extension}',
+                mimetype=renderer.content_type
+            )
+            response.vary.add('Accept')
+            _add_budget_report(response, proposal.json_content, buffer)
+            return response
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
+        except Exception as e:
+            return jsonify({'error': f'Failed to generate {renderer.name} document: {str(e)}'}), 500
+        
+    except Exception as e:
+        return jsonify({'error': f'Document generation failed: {str(e)}'}), 500
+
 @documents_bp.route('/proposals/<proposal_id>/download/word', methods=['GET'])
 @jwt_required()
 @require_roles([UserRole.BUSINESS_DEVELOPER])
@@ -90,7 +347,8 @@ def download_proposal_word(proposal_id):
     try:
         user_id = get_jwt_identity()
         
-        proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
+        with metrics.phase('db'):
+            proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
@@ -98,19 +356,29 @@ def download_proposal_word(proposal_id):
         if proposal.status != ProposalStatus.APPROVED.value:
             return jsonify({'error': 'Only approved proposals can be downloaded'}), 400
         
-        # Generate Word document
+        theme = request.args.get('theme', DEFAULT_THEME)
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        etag = proposal_etag(proposal, 'download', 'docx', theme, RENDERER_VERSION)
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
+        # Stream the pre-rendered Word document, rendering only if it is missing
         try:
-            doc_buffer = DocumentService.generate_word_document(
-                proposal.json_content, 
-                proposal.title
-            )
+            doc_buffer, _ = ArtifactService.open_document(proposal, 'docx', theme)
             
-            return send_file(
+            return send_document(
                 doc_buffer,
+                etag,
+                proposal.updated_at,
                 as_attachment=True,
                 download_name=f'{proposal.title}_final.docx',
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+                mimetype=ARTIFACT_CONTENT_TYPES['docx']
             )
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
         except Exception as e:
             return jsonify({'error': f'Failed to generate Word document: {str(e)}'}), 500
         
@@ -125,7 +393,8 @@ def download_proposal_pdf(proposal_id):
     try:
         user_id = get_jwt_identity()
         
-        proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
+        with metrics.phase('db'):
+            proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
@@ -133,44 +402,225 @@ def download_proposal_pdf(proposal_id):
         if proposal.status != ProposalStatus.APPROVED.value:
             return jsonify({'error': 'Only approved proposals can be downloaded'}), 400
         
-        # Generate PDF document
+        theme = request.args.get('theme', DEFAULT_THEME)
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        etag = proposal_etag(proposal, 'download', 'pdf', theme, RENDERER_VERSION)
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
+        # Stream the pre-rendered PDF document, rendering only if it is missing
         try:
-            pdf_buffer = DocumentService.generate_pdf_document(
-                proposal.json_content, 
-                proposal.title
-            )
+            pdf_buffer, _ = ArtifactService.open_document(proposal, 'pdf', theme)
             
-            return send_file(
+            return send_document(
                 pdf_buffer,
+                etag,
+                proposal.updated_at,
                 as_attachment=True,
                 download_name=f'{proposal.title}_final.pdf',
-                mimetype='application/pdf'
+                mimetype=ARTIFACT_CONTENT_TYPES['pdf']
             )
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
         except Exception as e:
             return jsonify({'error': f'Failed to generate PDF document: {str(e)}'}), 500
         
     except Exception as e:
         return jsonify({'error': f'Download failed: {str(e)}'}), 500
 
-@documents_bp.route('/proposals/<proposal_id>/template', methods=['GET'])
+@documents_bp.route('/proposals/<proposal_id>/render', methods=['POST'])
 @jwt_required()
-def get_proposal_template(proposal_id):
-    """Get proposal JSON template for editing"""
+def create_render_job(proposal_id):
+    """Queue a background render of a proposal in one or more formats"""
+    try:
+        data = request.get_json(silent=True) or {}
+        formats = data.get('formats') or ['pdf']
+        if not isinstance(formats, list) or not all(fmt in ARTIFACT_CONTENT_TYPES for fmt in formats):
+            return jsonify({'error': f'Formats must be a list containing: {list(ARTIFACT_CONTENT_TYPES)}'}), 400
+        
+        theme = data.get('theme') or DEFAULT_THEME
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        proposal = _get_accessible_proposal(proposal_id, user)
+        
+        if not proposal:
+            return jsonify({'error': 'Proposal not found'}), 404
+        
+        job = RenderJobService.submit(proposal, user, list(dict.fromkeys(formats)), theme)
+        
+        response = jsonify({
+            'message': 'Render job queued',
+            'job': job.to_dict()
+        })
+        response.status_code = 202
+        response.headers['Location'] = f'/api/documents/render-jobs/{job.id}'
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to queue render job: {str(e)}'}), 500
+
+def _get_render_job(job_id, user):
+    """Load a render job the user is allowed to see"""
+    job = RenderJob.objects(id=job_id).first()
+    if not job:
+        return None
+    if user.role == UserRole.BUSINESS_DEVELOPER.value and job.requested_by.id != user.id:
+        return None
+    return job
+
+@documents_bp.route('/render-jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_render_job(job_id):
+    """Get render job status, optionally long-polling with ?wait=<seconds>"""
+    try:
+        wait = min(float(request.args.get('wait', 0)), Config.RENDER_JOB_MAX_WAIT)
+        
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        job = _get_render_job(job_id, user)
+        if not job:
+            return jsonify({'error': 'Render job not found'}), 404
+        
+        job = RenderJobService.wait(job, wait)
+        
+        return jsonify({
+            'job': job.to_dict()
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to get render job: {str(e)}'}), 500
+
+@documents_bp.route('/render-jobs/<job_id>/download/<fmt>', methods=['GET'])
+@jwt_required()
+def download_render_job_result(job_id, fmt):
+    """Download one rendered format of a completed render job"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        job = _get_render_job(job_id, user)
+        if not job:
+            return jsonify({'error': 'Render job not found'}), 404
+        
+        if fmt not in job.formats:
+            return jsonify({'error': f'Format {fmt} was not requested for this job'}), 400
+        
+        if not job.is_finished:
+            return jsonify({'error': 'Render job is not finished yet', 'job': job.to_dict()}), 409
+        
+        if job.status == RenderJobStatus.FAILED.value:
+            return jsonify({'error': f'Render job failed: {job.error}'}), 500
+        
+        result = RenderJobService.open_result(job, fmt)
+        if result is None:
+            return jsonify({'error': 'Render result has expired, please queue a new render job'}), 410
+        
+        return send_document(
+            result,
+            as_attachment=True,
+            download_name=f'{job.proposal.title}.{fmt}',
+            mimetype=ARTIFACT_CONTENT_TYPES[fmt]
+        )
+        
+    except (RenderQueueFull, RenderTimeout) as e:
+        return _render_unavailable(e)
+    except Exception as e:
+        return jsonify({'error': f'Failed to download render result: {str(e)}'}), 500
+
+@documents_bp.route('/portfolio', methods=['POST'])
+@jwt_required()
+def create_portfolio():
+    """Merge several proposals into one PDF with optional cover and contents pages"""
     try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        proposal_ids = data.get('proposal_ids')
+        if not proposal_ids or not isinstance(proposal_ids, list):
+            return jsonify({'error': 'proposal_ids must be a non-empty list'}), 400
+        if not all(isinstance(proposal_id, str) and ObjectId.is_valid(proposal_id) for proposal_id in proposal_ids):
+            return jsonify({'error': 'proposal_ids must contain valid proposal ids'}), 400
+        if len(proposal_ids) > Config.PORTFOLIO_MAX_PROPOSALS:
+            return jsonify({'error': f'At most {Config.PORTFOLIO_MAX_PROPOSALS} proposals per portfolio'}), 400
+        
+        theme = data.get('theme') or DEFAULT_THEME
+        if theme not in theme_names():
+            return jsonify({'error': f'Unknown theme. Must be one of: {theme_names()}'}), 400
+        
+        title = (data.get('title') or 'Proposal Portfolio').strip()
+        
         user = get_current_user()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Check access permissions
         if user.role == UserRole.BUSINESS_DEVELOPER.value:
-            proposal = Proposal.objects(id=proposal_id, business_developer=user.id).first()
+            found = Proposal.objects(id__in=proposal_ids, business_developer=user.id)
         else:  # Admin can access all proposals
-            proposal = Proposal.objects(id=proposal_id).first()
+            found = Proposal.objects(id__in=proposal_ids)
+        
+        by_id = {str(proposal.id): proposal for proposal in found}
+        missing = [proposal_id for proposal_id in proposal_ids if proposal_id not in by_id]
+        if missing:
+            return jsonify({'error': f'Proposals not found: {missing}'}), 404
+        
+        try:
+            pdf_buffer = PortfolioService.build(
+                [by_id[proposal_id] for proposal_id in proposal_ids],
+                title=title,
+                include_cover=bool(data.get('cover', True)),
+                include_toc=bool(data.get('toc', True)),
+                theme=theme
+            )
+            
+            return send_document(
+                pdf_buffer,
+                as_attachment=True,
+                download_name=f'{title}.pdf',
+                mimetype='application/pdf'
+            )
+        except (RenderQueueFull, RenderTimeout) as e:
+            return _render_unavailable(e)
+        except Exception as e:
+            return jsonify({'error': f'Failed to generate portfolio: {str(e)}'}), 500
+        
+    except Exception as e:
+        return jsonify({'error': f'Portfolio generation failed: {str(e)}'}), 500
+
+@documents_bp.route('/proposals/<proposal_id>/template', methods=['GET'])
+@jwt_required()
+def get_proposal_template(proposal_id):
+    """Get proposal JSON template for editing"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        proposal = _get_accessible_proposal(proposal_id, user)
         
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
-        return jsonify({
+        etag = proposal_etag(proposal, 'template')
+        cached = not_modified(etag, proposal.updated_at)
+        if cached:
+            return cached
+        
+        return add_validators(jsonify({
             'template': proposal.json_content,
             'proposal_info': {
                 'id': str(proposal.id),
@@ -178,7 +628,7 @@ def get_proposal_template(proposal_id):
                 'status': proposal.status,
                 'version': proposal.current_version
             }
-        }), 200
+        }), etag, proposal.updated_at)
         
     except Exception as e:
         return jsonify({'error': f'Failed to get template: {str(e)}'}), 500
@@ -199,7 +649,8 @@ def update_proposal_template(proposal_id):
         
         user_id = get_jwt_identity()
         
-        proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
+        with metrics.phase('db'):
+            proposal = Proposal.objects(id=proposal_id, business_developer=user_id).first()
         if not proposal:
             return jsonify({'error': 'Proposal not found'}), 404
         
@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from mongoengine import NotUniqueError
+from config import Config
+from app.models.proposal import Proposal, ProposalStatus
+from app.models.rendered_document import RenderedDocument
+from app.services.document_service import DocumentService
+from app.services.render_themes import DEFAULT_THEME
+
+ARTIFACT_FORMATS = ('pdf', 'docx')
+
+ARTIFACT_CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=Config.ARTIFACT_RENDER_WORKERS,
+    thread_name_prefix='artifact-render'
+)
+
+class ArtifactService:
+    """Pre-rendered final documents for approved proposals, stored in GridFS"""
+
+    @staticmethod
+    def schedule_prerender(proposal):
+        """Queue a background render of every final format for an approved proposal"""
+        return _executor.submit(ArtifactService.prerender, str(proposal.id))
+
+    @staticmethod
+    def prerender(proposal_id):
+        """Render and store all final formats for a proposal's current version"""
+        proposal = Proposal.objects(id=proposal_id).first()
+        if not proposal or proposal.status != ProposalStatus.APPROVED.value:
+            return
+
+        # Artifacts of earlier versions can never be served again
+        for old in RenderedDocument.objects(proposal=proposal, version__ne=proposal.current_version):
+            old.file.delete()
+            old.delete()
+
+        for fmt in ARTIFACT_FORMATS:
+            try:
+                if ArtifactService._fresh_artifact(proposal, fmt):
+                    continue
+                data = DocumentService.render_bytes(
+                    fmt,
+                    proposal.json_content,
+                    proposal.title,
+                    proposal_id=proposal.id
+                )
+                ArtifactService._store(proposal, fmt, data)
+            except Exception as e:
+                print(f"Artifact pre-render error for {proposal_id} ({fmt}): {e}")
+
+    @staticmethod
+    def open_document(proposal, fmt, theme=DEFAULT_THEME):
+        """
+        Return a readable file object and its size for the final document.
+        Streams the stored artifact when present, otherwise renders on demand.
+        Only the default theme is pre-rendered; other themes always render.
+        """
+        if theme == DEFAULT_THEME:
+            artifact = ArtifactService._fresh_artifact(proposal, fmt)
+            if artifact:
+                grid_out = artifact.file.get()
+                if grid_out is not None:
+                    return grid_out, grid_out.length
+
+        buffer = DocumentService.render_document(
+            fmt,
+            proposal.json_content,
+            proposal.title,
+            proposal_id=proposal.id,
+            theme=theme
+        )
+        if theme == DEFAULT_THEME and proposal.status == ProposalStatus.APPROVED.value:
+            ArtifactService.schedule_prerender(proposal)
+        return buffer, buffer.size
+
+    @staticmethod
+    def read_artifact(proposal, fmt):
+        """Bytes of the stored artifact for the proposal's current content, or None"""
+        artifact = ArtifactService._fresh_artifact(proposal, fmt)
+        if not artifact:
+            return None
+        grid_out = artifact.file.get()
+        return grid_out.read() if grid_out is not None else None
+
+    @staticmethod
+    def _fresh_artifact(proposal, fmt):
+        """Stored artifact matching the proposal's current version and content, if any"""
+        artifact = RenderedDocument.get_for_proposal(proposal, fmt)
+        if not artifact:
+            return None
+        if artifact.content_key != DocumentService.render_key(fmt, proposal.json_content, proposal.title):
+            # Content changed without a version bump; drop the stale render
+            artifact.file.delete()
+            artifact.delete()
+            return None
+        return artifact
+
+    @staticmethod
+    def _store(proposal, fmt, data):
+        """Persist rendered bytes for the proposal's current version"""
+        artifact = RenderedDocument(
+            proposal=proposal,
+            version=proposal.current_version,
+            format=fmt,
+            content_key=DocumentService.render_key(fmt, proposal.json_content, proposal.title),
+            size=len(data)
+        )
+        artifact.file.put(BytesIO(data), content_type=ARTIFACT_CONTENT_TYPES[fmt])
+        try:
+            artifact.save()
+        except NotUniqueError:
+            # Another worker stored this version first
+            artifact.file.delete()
@@ -1,66 +1,235 @@
 from docx import Document
-from docx.shared import Inches, Pt
+from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.shared import OxmlElement, qn
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor
 from io import BytesIO
+from copy import copy, deepcopy
+import time
+from mongoengine import signals
+from pypdf import PdfReader
+from config import Config
+from app.models.proposal import Proposal
+from app.services.render_cache import RenderCache
+from app.services.fragment_cache import FragmentCache
+from app.services.docx_writer import blocks_to_xml, repack
+from app.services.render_engine import render_engine, RenderQueueFull, RenderTimeout, RenderCancelled
+from app.services.document_spool import inflight_bytes, spool_document
+from app.services.proposal_ir import (
+    compile_sections, budget_report, clamp_nesting, title_block, SKIPPED_SECTIONS, PAGES_BUDGET, HEADING, FIELD, BULLET, TRUNCATED
+)
+from app.services.render_themes import get_theme, DEFAULT_THEME
+from app.services.renderer_registry import Renderer, register_renderer, get_renderer, renderer_names
+from app.services import text_renderers
+from app.services import metrics
 import json
 
+# Bump whenever rendering output changes so cached documents are not reused
+RENDERER_VERSION = '4'
+
+render_cache = RenderCache(
+    max_entries=Config.RENDER_CACHE_MAX_ENTRIES,
+    max_memory_bytes=Config.RENDER_CACHE_MAX_MEMORY,
+    disk_dir=Config.RENDER_CACHE_DIR,
+    max_disk_bytes=Config.RENDER_CACHE_MAX_DISK
+)
+
+# Per-section output reused across renders in the same process, keyed by
+# (format, theme, section content hash); only edited sections are rebuilt
+fragment_cache = FragmentCache(Config.RENDER_FRAGMENT_CACHE_ENTRIES)
+
+_SECT_PR = qn('w:sectPr')
+
+# PDF keyword recording a render budget hit during layout, e.g. 'render-budget-exceeded:pages'
+_BUDGET_KEYWORD = 'render-budget-exceeded:'
+
+class _BudgetedDocTemplate(SimpleDocTemplate):
+    """
+    Stops laying out pages once a page count or time budget runs out.
+    Remaining content is replaced by the overflow flowables, if any. If
+    budget is given, hitting max_pages is recorded under that name in the
+    PDF's keywords, so it survives the render cache and stored artifacts.
+    With RENDER_DETERMINISTIC, reportlab's invariant mode fixes the creation
+    dates and derives the document ID from the content.
+    """
+    
+    def __init__(self, filename, max_pages, deadline=None, overflow=None, budget=None, **kwargs):
+        kwargs.setdefault('invariant', int(Config.RENDER_DETERMINISTIC))
+        super().__init__(filename, **kwargs)
+        self.max_pages = max_pages
+        self.deadline = deadline
+        self.overflow = overflow or []
+        self.budget = budget
+        self.truncated = False
+        self._pending = None
+    
+    def build(self, flowables, **kwargs):
+        # reportlab consumes this list in place, so replacing its contents ends the build
+        self._pending = flowables
+        super().build(flowables, **kwargs)
+    
+    def handle_pageEnd(self):
+        if self._pending and not self.truncated and (
+            self.page >= self.max_pages or
+            (self.deadline is not None and time.monotonic() >= self.deadline)
+        ):
+            self.truncated = True
+            self._pending[:] = self.overflow
+            if self.budget and self.page >= self.max_pages:
+                self.canv.setKeywords(_BUDGET_KEYWORD + self.budget)
+        super().handle_pageEnd()
+
+def _draw_draft_label(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillGray(0.5)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, 'Draft preview')
+    canvas.restoreState()
+
 class DocumentService:
     
+    @staticmethod
+    def render_key(fmt, proposal_json, proposal_title="Upwork Proposal", theme=DEFAULT_THEME):
+        """Content-addressed key identifying a render of this proposal content"""
+        return RenderCache.make_key(fmt, proposal_title, proposal_json, RENDERER_VERSION, theme)
+    
+    @staticmethod
+    def budget_report(proposal_json):
+        """Render budgets (depth, nodes, chars) that this proposal content exceeds"""
+        return budget_report(proposal_json)
+    
+    @staticmethod
+    def layout_budget_report(document):
+        """
+        Render budgets hit while laying out a rendered document (the page
+        budget of a PDF), read from the document itself. The read position
+        is left unchanged.
+        """
+        position = document.tell()
+        try:
+            document.seek(0)
+            if document.read(5) != b'%PDF-':
+                return []
+            keywords = (PdfReader(document).metadata or {}).get('/Keywords') or ''
+        except Exception:
+            return []
+        finally:
+            document.seek(position)
+        return [keyword[len(_BUDGET_KEYWORD):] for keyword in keywords.split() if keyword.startswith(_BUDGET_KEYWORD)]
+    
+    @staticmethod
+    def render_bytes(fmt, proposal_json, proposal_title="Upwork Proposal", proposal_id=None, theme=DEFAULT_THEME,
+                     cancelled=None):
+        """
+        Render a proposal in any registered format. Heavy formats go through
+        the render cache, building on the render engine on a miss; cheap text
+        formats are built inline.
+        Returns the document bytes and raises if rendering fails, or
+        RenderCancelled once the optional cancelled event is set.
+        """
+        renderer = get_renderer(fmt)
+        get_theme(theme)  # Reject unknown themes before queueing a render
+        
+        proposal_json = clamp_nesting(proposal_json)
+        if not renderer.uses_engine:
+            with metrics.phase('build'):
+                data = renderer.build(proposal_json, proposal_title, theme)
+            metrics.observe('render_output_bytes', len(data), format=fmt)
+            return data
+        
+        def render():
+            data = render_engine.render(fmt, proposal_json, proposal_title, theme, cancelled=cancelled)
+            metrics.observe('render_output_bytes', len(data), format=fmt)
+            return data
+        
+        return render_cache.get_or_render(
+            DocumentService.render_key(fmt, proposal_json, proposal_title, theme),
+            render,
+            proposal_id=proposal_id
+        )
+    
+    @staticmethod
+    def build_bytes(fmt, proposal_json, proposal_title="Upwork Proposal", theme=DEFAULT_THEME):
+        """
+        Build a document in this process, bypassing the render cache and
+        render engine. For batch tools that manage their own processes.
+        """
+        renderer = get_renderer(fmt)
+        get_theme(theme)
+        return renderer.build(clamp_nesting(proposal_json), proposal_title, theme)
+    
+    @staticmethod
+    def render_document(fmt, proposal_json, proposal_title="Upwork Proposal", proposal_id=None, theme=DEFAULT_THEME,
+                        cancelled=None):
+        """
+        Render a proposal in any registered format through the render cache.
+        Returns a SpooledDocument positioned at the start of the document; if
+        a PDF or DOCX render fails it holds an error document and its
+        render_error is set. Raises RenderQueueFull or RenderTimeout when the render engine is
+        saturated or too many rendered bytes are still waiting to be sent,
+        and RenderCancelled once the optional cancelled event is set.
+        """
+        get_renderer(fmt)
+        get_theme(theme)
+        inflight_bytes.check()
+        
+        try:
+            data = DocumentService.render_bytes(fmt, proposal_json, proposal_title, proposal_id, theme, cancelled)
+        except (RenderQueueFull, RenderTimeout, RenderCancelled):
+            raise
+        except Exception as e:
+            # Error documents are returned but never cached
+            print(f"{fmt.upper()} generation error: {e}")
+            if fmt == 'pdf':
+                error_document = spool_document(DocumentService._generate_error_pdf_doc(str(e)).getvalue())
+            elif fmt == 'docx':
+                error_document = spool_document(DocumentService._generate_error_word_doc(str(e)).getvalue())
+            else:
+                raise
+            error_document.render_error = str(e)
+            return error_document
+        
+        return spool_document(data)
+    
+    @staticmethod
+    def render_draft(fmt, proposal_json, proposal_title="Upwork Proposal", theme=DEFAULT_THEME, cancelled=None):
+        """
+        Render a fast, low-fidelity preview: only the leading sections, and for
+        PDF only the first pages within a layout time budget, uncompressed.
+        Drafts are not cached. Returns (SpooledDocument, truncated).
+        """
+        if fmt not in DocumentService._draft_builders():
+            raise ValueError(f"Unsupported document format: {fmt}")
+        get_theme(theme)
+        inflight_bytes.check()
+        
+        proposal_json = clamp_nesting(proposal_json)
+        sections = [(key, value) for key, value in proposal_json.items() if key not in SKIPPED_SECTIONS]
+        truncated = len(sections) > Config.PREVIEW_DRAFT_SECTIONS
+        
+        data, layout_truncated = render_engine.render(
+            fmt,
+            dict(sections[:Config.PREVIEW_DRAFT_SECTIONS]),
+            proposal_title,
+            theme,
+            draft=True,
+            timeout=Config.PREVIEW_DRAFT_TIMEOUT,
+            cancelled=cancelled
+        )
+        return spool_document(data), truncated or layout_truncated
+    
     @staticmethod
     def generate_word_document(proposal_json, proposal_title="Upwork Proposal"):
         """
         Generate Word document from proposal JSON
         """
         try:
-            doc = Document()
-            
-            # Set document margins
-            sections = doc.sections
-            for section in sections:
-                section.top_margin = Inches(1)
-                section.bottom_margin = Inches(1)
-                section.left_margin = Inches(1)
-                section.right_margin = Inches(1)
-            
-            # Add title
-            title = doc.add_heading(proposal_title, 0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Add a line break
-            doc.add_paragraph()
-            
-            # Add sections from JSON
-            for section_key, content in proposal_json.items():
-                if section_key == 'revision_notes':
-                    continue  # Skip revision notes in final document
-                    
-                section_title = DocumentService._format_section_title(section_key)
-                doc.add_heading(section_title, level=1)
-                
-                if isinstance(content, dict):
-                    DocumentService._add_dict_content_to_doc(doc, content)
-                elif isinstance(content, list):
-                    DocumentService._add_list_content_to_doc(doc, content)
-                else:
-                    doc.add_paragraph(str(content))
-                
-                # Add spacing between sections
-                doc.add_paragraph()
-            
-            # Save to buffer
-            buffer = BytesIO()
-            doc.save(buffer)
-            buffer.seek(0)
-            
-            return buffer
-            
+            return BytesIO(render_engine.render('docx', proposal_json, proposal_title))
+        except (RenderQueueFull, RenderTimeout):
+            raise
         except Exception as e:
             print(f"Word generation error: {e}")
             return DocumentService._generate_error_word_doc(str(e))
@@ -71,125 +240,245 @@ class DocumentService:
         Generate PDF document from proposal JSON
         """
         try:
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(
-                buffer, 
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=72
-            )
-            
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=20,
-                spaceAfter=30,
-                alignment=1,  # Center aligned
-                textColor=HexColor('#1f4788')
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=14,
-                spaceAfter=12,
-                spaceBefore=20,
-                textColor=HexColor('#1f4788')
-            )
-            
-            subheading_style = ParagraphStyle(
-                'CustomSubheading',
-                parent=styles['Heading3'],
-                fontSize=12,
-                spaceAfter=8,
-                spaceBefore=12,
-                textColor=HexColor('#2c5aa0')
-            )
-            
-            content = []
-            
-            # Add title
-            content.append(Paragraph(proposal_title, title_style))
-            content.append(Spacer(1, 20))
-            
-            # Add sections from JSON
-            for section_key, section_content in proposal_json.items():
-                if section_key == 'revision_notes':
-                    continue  # Skip revision notes
-                    
-                section_title = DocumentService._format_section_title(section_key)
-                content.append(Paragraph(section_title, heading_style))
-                
-                if isinstance(section_content, dict):
-                    DocumentService._add_dict_content_to_pdf(content, section_content, styles, subheading_style)
-                elif isinstance(section_content, list):
-                    DocumentService._add_list_content_to_pdf(content, section_content, styles)
-                else:
-                    content.append(Paragraph(str(section_content), styles['BodyText']))
-                
-                content.append(Spacer(1, 15))
-            
-            doc.build(content)
-            buffer.seek(0)
-            
-            return buffer
-            
+            return BytesIO(render_engine.render('pdf', proposal_json, proposal_title))
+        except (RenderQueueFull, RenderTimeout):
+            raise
         except Exception as e:
             print(f"PDF generation error: {e}")
             return DocumentService._generate_error_pdf_doc(str(e))
     
     @staticmethod
-    def _format_section_title(section_key):
-        """Format section key to readable title"""
-        return section_key.replace('_', ' ').title()
+    def _builders():
+        """Map of registered formats to their raw document builders"""
+        return {name: get_renderer(name).build for name in renderer_names()}
     
     @staticmethod
-    def _add_dict_content_to_doc(doc, content_dict):
-        """Add dictionary content to Word document"""
-        for key, value in content_dict.items():
-            if isinstance(value, dict):
-                doc.add_heading(DocumentService._format_section_title(key), level=2)
-                DocumentService._add_dict_content_to_doc(doc, value)
-            elif isinstance(value, list):
-                doc.add_heading(DocumentService._format_section_title(key), level=2)
-                DocumentService._add_list_content_to_doc(doc, value)
-            else:
-                p = doc.add_paragraph()
-                p.add_run(f"{DocumentService._format_section_title(key)}: ").bold = True
-                p.add_run(str(value))
+    def _draft_builders():
+        """Map of supported formats to draft builders returning (bytes, truncated)"""
+        return {
+            'pdf': DocumentService._build_pdf_draft,
+            'docx': DocumentService._build_word_draft
+        }
     
     @staticmethod
-    def _add_list_content_to_doc(doc, content_list):
-        """Add list content to Word document"""
-        for item in content_list:
-            p = doc.add_paragraph(str(item), style='List Bullet')
+    def _build_word_document(proposal_json, proposal_title, theme=DEFAULT_THEME):
+        """Build Word document bytes, raising on failure"""
+        theme = get_theme(theme)
+        with metrics.phase('compile'):
+            sections = compile_sections(proposal_json)
+        
+        if Config.DOCX_WRITER == 'stream':
+            try:
+                return DocumentService._write_word_document(sections, proposal_title, theme)
+            except Exception as e:
+                print(f"Streaming DOCX writer failed, falling back to python-docx: {e}")
+        return DocumentService._build_word_tree(sections, proposal_title, theme)
     
     @staticmethod
-    def _add_dict_content_to_pdf(content, content_dict, styles, subheading_style):
-        """Add dictionary content to PDF"""
-        for key, value in content_dict.items():
-            if isinstance(value, dict):
-                content.append(Paragraph(DocumentService._format_section_title(key), subheading_style))
-                DocumentService._add_dict_content_to_pdf(content, value, styles, subheading_style)
-            elif isinstance(value, list):
-                content.append(Paragraph(DocumentService._format_section_title(key), subheading_style))
-                DocumentService._add_list_content_to_pdf(content, value, styles)
-            else:
-                content.append(Paragraph(
-                    f"<b>{DocumentService._format_section_title(key)}:</b> {value}",
-                    styles['BodyText']
+    def _write_word_document(sections, proposal_title, theme):
+        """Stream per-section body XML into the theme's precomputed Word package"""
+        package = theme.docx_package()
+        with metrics.phase('docx_build'):
+            fragments = [fragment_cache.get_or_build(
+                ('docx_xml', theme.name, 'title', proposal_title),
+                lambda: blocks_to_xml((title_block(proposal_title),), package.style_ids)
+            )]
+            for section_hash, blocks in sections:
+                fragments.append(fragment_cache.get_or_build(
+                    ('docx_xml', theme.name, section_hash),
+                    lambda blocks=blocks: blocks_to_xml(blocks, package.style_ids)
+                ))
+        
+        with metrics.phase('docx_save'):
+            return package.write(fragments)
+    
+    @staticmethod
+    def _build_word_tree(sections, proposal_title, theme):
+        """Build Word document bytes through python-docx"""
+        # Render into the theme's pre-parsed base document (margins and styles already set)
+        base = theme.word_base()
+        try:
+            with metrics.phase('docx_build'):
+                fragments = [DocumentService._word_fragment(
+                    base, ('docx', theme.name, 'title', proposal_title), (title_block(proposal_title),)
+                )]
+                for section_hash, blocks in sections:
+                    fragments.append(DocumentService._word_fragment(base, ('docx', theme.name, section_hash), blocks))
+                
+                # Stitch copies of the cached section XML into the body
+                body = base.document.element.body
+                sect_pr = body.find(_SECT_PR)
+                for fragment in fragments:
+                    for element in fragment:
+                        sect_pr.addprevious(deepcopy(element))
+            
+            # Save to buffer
+            buffer = BytesIO()
+            with metrics.phase('docx_save'):
+                base.document.save(buffer)
+        except Exception:
+            theme.discard_word_base()
+            raise
+        theme.reset_word_base()
+        
+        if Config.RENDER_DETERMINISTIC:
+            return repack(buffer.getvalue())
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _word_fragment(base, key, blocks):
+        """Body elements for one section, rendered into the empty base document and detached"""
+        def build():
+            body = base.document.element.body
+            DocumentService._add_blocks_to_doc(base.document, blocks, base.styles)
+            elements = tuple(child for child in body if child.tag != _SECT_PR)
+            for element in elements:
+                body.remove(element)
+            return elements
+        
+        return fragment_cache.get_or_build(key, build)
+    
+    @staticmethod
+    def _build_pdf_document(proposal_json, proposal_title, theme=DEFAULT_THEME):
+        """Build PDF document bytes, raising on failure"""
+        theme = get_theme(theme)
+        buffer = BytesIO()
+        doc = _BudgetedDocTemplate(
+            buffer, 
+            max_pages=Config.RENDER_MAX_PAGES,
+            budget=PAGES_BUDGET,
+            overflow=[Paragraph(
+                f'<i>[Document truncated: proposal exceeds the {Config.RENDER_MAX_PAGES} page limit]</i>',
+                theme.pdf_styles()['body']
+            )],
+            pagesize=theme.pdf_page_size,
+            rightMargin=theme.pdf_margin,
+            leftMargin=theme.pdf_margin,
+            topMargin=theme.pdf_margin,
+            bottomMargin=theme.pdf_margin
+        )
+        
+        content = DocumentService._pdf_content(proposal_json, proposal_title, theme)
+        
+        with metrics.phase('layout'):
+            doc.build(content)
+        metrics.observe('render_pages', doc.page, format='pdf')
+        if doc.truncated:
+            print(f"Render budget exceeded ({PAGES_BUDGET}) for '{proposal_title}'")
+        
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _build_pdf_draft(proposal_json, proposal_title, theme=DEFAULT_THEME):
+        """Build an uncompressed PDF of the first pages only, returning (bytes, truncated)"""
+        theme = get_theme(theme)
+        buffer = BytesIO()
+        doc = _BudgetedDocTemplate(
+            buffer,
+            max_pages=Config.PREVIEW_DRAFT_PAGES,
+            deadline=time.monotonic() + Config.PREVIEW_DRAFT_LAYOUT_BUDGET,
+            pagesize=theme.pdf_page_size,
+            rightMargin=theme.pdf_margin,
+            leftMargin=theme.pdf_margin,
+            topMargin=theme.pdf_margin,
+            bottomMargin=theme.pdf_margin,
+            pageCompression=0
+        )
+        
+        content = DocumentService._pdf_content(proposal_json, proposal_title, theme)
+        
+        with metrics.phase('layout'):
+            doc.build(content, onFirstPage=_draw_draft_label, onLaterPages=_draw_draft_label)
+        
+        return buffer.getvalue(), doc.truncated
+    
+    @staticmethod
+    def _build_word_draft(proposal_json, proposal_title, theme=DEFAULT_THEME):
+        """Word drafts only drop sections; python-docx output is already cheap to build"""
+        return DocumentService._build_word_document(proposal_json, proposal_title, theme), False
+    
+    @staticmethod
+    def _pdf_content(proposal_json, proposal_title, theme):
+        """Flowables for a proposal, stitched from the per-section fragment cache"""
+        styles = theme.pdf_styles()
+        
+        with metrics.phase('compile'):
+            sections = compile_sections(proposal_json)
+        
+        # Layout state is written onto flowables during build, so each render
+        # gets shallow copies; the parsed paragraph text is shared
+        with metrics.phase('flowables'):
+            content = [copy(f) for f in fragment_cache.get_or_build(
+                ('pdf', theme.name, 'title', proposal_title),
+                lambda: DocumentService._blocks_to_flowables((title_block(proposal_title),), styles)
+            )]
+            for section_hash, blocks in sections:
+                content.extend(copy(f) for f in fragment_cache.get_or_build(
+                    ('pdf', theme.name, section_hash),
+                    lambda: DocumentService._blocks_to_flowables(blocks, styles)
                 ))
+        return content
+    
+    @staticmethod
+    def _add_blocks_to_doc(doc, blocks, styles):
+        """Add compiled proposal blocks to Word document using resolved style handles"""
+        in_section = False
+        for block in blocks:
+            if block.kind == HEADING and block.level == 0:
+                title = doc.add_paragraph(block.text, styles['title'])
+                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                doc.add_paragraph()  # Line break after the title
+            elif block.kind == HEADING and block.level == 1:
+                if in_section:
+                    doc.add_paragraph()  # Spacing between sections
+                in_section = True
+                doc.add_paragraph(block.text, styles['heading'])
+            elif block.kind == HEADING:
+                doc.add_paragraph(block.text, styles['subheading'])
+            elif block.kind == FIELD:
+                p = doc.add_paragraph()
+                p.add_run(f"{block.label}: ").bold = True
+                p.add_run(block.text)
+            elif block.kind == BULLET:
+                doc.add_paragraph(block.text, styles['bullet'])
+            elif block.kind == TRUNCATED:
+                doc.add_paragraph().add_run(block.text).italic = True
+            else:
+                doc.add_paragraph(block.text)
+        if in_section:
+            doc.add_paragraph()
     
     @staticmethod
-    def _add_list_content_to_pdf(content, content_list, styles):
-        """Add list content to PDF"""
-        for item in content_list:
-            content.append(Paragraph(f"• {item}", styles['BodyText']))
+    def _blocks_to_flowables(blocks, styles):
+        """Convert compiled proposal blocks to PDF flowables"""
+        title_style = styles['title']
+        heading_style = styles['heading']
+        subheading_style = styles['subheading']
+        body_style = styles['body']
+        content = []
+        in_section = False
+        for block in blocks:
+            if block.kind == HEADING and block.level == 0:
+                content.append(Paragraph(block.text, title_style))
+                content.append(Spacer(1, 20))
+            elif block.kind == HEADING and block.level == 1:
+                if in_section:
+                    content.append(Spacer(1, 15))
+                in_section = True
+                content.append(Paragraph(block.text, heading_style))
+            elif block.kind == HEADING:
+                content.append(Paragraph(block.text, subheading_style))
+            elif block.kind == FIELD:
+                content.append(Paragraph(f"<b>{block.label}:</b> {block.text}", body_style))
+            elif block.kind == BULLET:
+                content.append(Paragraph(f"• {block.text}", body_style))
+            elif block.kind == TRUNCATED:
+                content.append(Paragraph(f"<i>{block.text}</i>", body_style))
+            else:
+                content.append(Paragraph(block.text, body_style))
+        if in_section:
+            content.append(Spacer(1, 15))
+        return content
     
     @staticmethod
     def _generate_error_word_doc(error_message):
@@ -214,4 +503,23 @@ class DocumentService:
         c.drawString(100, 640, "Please contact support if this issue persists.")
         c.save()
         buffer.seek(0)
-        return buffer
\ No newline at end of file
+        return buffer
+
+register_renderer(Renderer(
+    'pdf', DocumentService._build_pdf_document, 'application/pdf', 'pdf', uses_engine=True
+))
+register_renderer(Renderer(
+    'docx', DocumentService._build_word_document,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx', uses_engine=True
+))
+register_renderer(Renderer('html', text_renderers.build_html, 'text/html', 'html'))
+register_renderer(Renderer('markdown', text_renderers.build_markdown, 'text/markdown', 'md'))
+register_renderer(Renderer('text', text_renderers.build_text, 'text/plain', 'txt'))
+
+def _invalidate_rendered_proposal(sender, document, **kwargs):
+    """Drop cached renders whenever a proposal is written or deleted"""
+    if document.id is not None:
+        render_cache.invalidate_proposal(document.id)
+
+signals.post_save.connect(_invalidate_rendered_proposal, sender=Proposal)
+signals.post_delete.connect(_invalidate_rendered_proposal, sender=Proposal)
\ No newline at end of file
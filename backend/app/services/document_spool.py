@@ -0,0 +1,80 @@
+import threading
+from tempfile import SpooledTemporaryFile
+from config import Config
+from app.services.render_engine import RenderQueueFull
+
+
+class InflightBytes:
+    """
+    Bytes of rendered documents held by this process until their responses
+    finish sending. Past the limit new renders are refused with
+    RenderQueueFull, so slow clients cannot pile up document memory.
+    """
+
+    def __init__(self, limit, retry_after):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.current = 0
+        self._lock = threading.Lock()
+
+    def check(self, size=0):
+        """
+        Raise RenderQueueFull if size more bytes of render output should not
+        be taken on. Output bigger than the whole limit is only let through
+        when nothing else is in flight, rather than never.
+        """
+        if not self.limit:
+            return
+        if self.current >= self.limit or (self.current and self.current + size > self.limit):
+            raise RenderQueueFull(self.retry_after)
+
+    def add(self, size):
+        with self._lock:
+            self.current += size
+
+    def release(self, size):
+        with self._lock:
+            self.current -= size
+
+
+class SpooledDocument(SpooledTemporaryFile):
+    """
+    A rendered document kept in memory up to RENDER_SPOOL_MAX_MEMORY bytes
+    and in a temporary file beyond that. Once written, finish() counts its
+    size towards the in-flight bytes until it is closed, which the WSGI
+    server does once it is sent.
+    """
+
+    def __init__(self, tracker):
+        super().__init__(max_size=Config.RENDER_SPOOL_MAX_MEMORY)
+        self.size = 0
+        self.render_error = None  # Set when this holds an error document instead of the render
+        self._tracker = tracker
+
+    def finish(self):
+        """Count the written document against the in-flight bytes and rewind to its start"""
+        self.size = self.tell()
+        self._tracker.add(self.size)
+        self.seek(0)
+
+    def close(self):
+        tracker, self._tracker = getattr(self, '_tracker', None), None
+        if tracker is not None:
+            tracker.release(self.size)
+        super().close()
+
+
+inflight_bytes = InflightBytes(Config.RENDER_INFLIGHT_MAX_BYTES, Config.RENDER_ENGINE_RETRY_AFTER)
+
+
+def new_spool():
+    """An empty SpooledDocument to write a document into; call finish() once it is written"""
+    return SpooledDocument(inflight_bytes)
+
+
+def spool_document(data):
+    """Wrap rendered bytes in a SpooledDocument positioned at the start"""
+    spool = new_spool()
+    spool.write(data)
+    spool.finish()
+    return spool
@@ -0,0 +1,183 @@
+import re
+import time
+import zipfile
+from io import BytesIO
+from config import Config
+from app.services.proposal_ir import HEADING, FIELD, BULLET, TRUNCATED
+
+DOCUMENT_PART = 'word/document.xml'
+
+# Zip entry timestamp for deterministic output; the earliest a zip can hold
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_BODY_OPEN = b'<w:body>'
+_SECT_PR_OPEN = b'<w:sectPr'
+
+# Characters lxml refuses to serialize; python-docx fails on the same input
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff￾￿]')
+_RUN_SPECIAL_CHARS = re.compile('([\t\r\n])')
+
+
+class DocxPackage:
+    """
+    A Word package split into everything except the document body.
+
+    The static parts (content types, styles, settings, numbering, theme) and
+    the document.xml prologue and section settings are captured once from a
+    saved python-docx base document. write() then streams body paragraphs,
+    produced as WordprocessingML strings, straight into the zip entry instead
+    of building and serializing an lxml tree per paragraph and run.
+    """
+
+    def __init__(self, parts, document_head, document_tail, style_ids):
+        self.parts = parts  # [(name, bytes or None for document.xml)] in package order
+        self.document_head = document_head
+        self.document_tail = document_tail
+        self.style_ids = style_ids
+
+    @classmethod
+    def from_base(cls, word_base):
+        """Capture the package of a base document whose body holds only its section settings"""
+        buffer = BytesIO()
+        word_base.document.save(buffer)
+
+        parts = []
+        document_xml = None
+        with zipfile.ZipFile(buffer) as package:
+            for name in package.namelist():
+                if name == DOCUMENT_PART:
+                    document_xml = package.read(name)
+                    parts.append((name, None))
+                else:
+                    parts.append((name, package.read(name)))
+
+        if document_xml is None:
+            raise ValueError('Base document has no main document part')
+        body_start = document_xml.find(_BODY_OPEN)
+        sect_pr_start = document_xml.find(_SECT_PR_OPEN)
+        if body_start < 0 or sect_pr_start != body_start + len(_BODY_OPEN):
+            raise ValueError('Base document body must be empty')
+
+        style_ids = {name: style.style_id for name, style in word_base.styles.items()}
+        return cls(parts, document_xml[:sect_pr_start], document_xml[sect_pr_start:], style_ids)
+
+    def write(self, fragments):
+        """Return .docx bytes with the given body XML fragments (bytes) in order"""
+        buffer = BytesIO()
+        date_time = _entry_date_time()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+            for name, data in self.parts:
+                if data is not None:
+                    package.writestr(_zip_info(name, date_time), data)
+                    continue
+                with package.open(_zip_info(name, date_time), 'w') as part:
+                    part.write(self.document_head)
+                    for fragment in fragments:
+                        part.write(fragment)
+                    part.write(self.document_tail)
+        return buffer.getvalue()
+
+
+def repack(data):
+    """Rewrite a .docx produced elsewhere (python-docx) with this writer's entry timestamps"""
+    buffer = BytesIO()
+    date_time = _entry_date_time()
+    with zipfile.ZipFile(BytesIO(data)) as source, zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        for name in source.namelist():
+            package.writestr(_zip_info(name, date_time), source.read(name))
+    return buffer.getvalue()
+
+
+def _entry_date_time():
+    if Config.RENDER_DETERMINISTIC:
+        return FIXED_DATE_TIME
+    return time.localtime(time.time())[:6]
+
+
+def _zip_info(name, date_time):
+    """Entry metadata matching what python-docx writes, apart from the timestamp"""
+    info = zipfile.ZipInfo(name, date_time)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info
+
+
+def blocks_to_xml(blocks, style_ids):
+    """
+    Body XML for compiled proposal blocks, matching what
+    DocumentService._add_blocks_to_doc produces through python-docx
+    """
+    parts = []
+    in_section = False
+    for block in blocks:
+        if block.kind == HEADING and block.level == 0:
+            parts.append(_paragraph(_run(block.text), style_ids['title'], center=True))
+            parts.append('<w:p/>')  # Line break after the title
+        elif block.kind == HEADING and block.level == 1:
+            if in_section:
+                parts.append('<w:p/>')  # Spacing between sections
+            in_section = True
+            parts.append(_paragraph(_run(block.text), style_ids['heading']))
+        elif block.kind == HEADING:
+            parts.append(_paragraph(_run(block.text), style_ids['subheading']))
+        elif block.kind == FIELD:
+            parts.append(_paragraph(
+                _run(f"{block.label}: ", '<w:b/>') + _run(block.text, force=True)
+            ))
+        elif block.kind == BULLET:
+            parts.append(_paragraph(_run(block.text), style_ids['bullet']))
+        elif block.kind == TRUNCATED:
+            parts.append(_paragraph(_run(block.text, '<w:i/>', force=True)))
+        else:
+            parts.append(_paragraph(_run(block.text)))
+    if in_section:
+        parts.append('<w:p/>')
+    return ''.join(parts).encode('utf-8')
+
+
+def _paragraph(runs, style_id=None, center=False):
+    properties = ''
+    if style_id:
+        properties += f'<w:pStyle w:val="{style_id}"/>'
+    if center:
+        properties += '<w:jc w:val="center"/>'
+    if properties:
+        properties = f'<w:pPr>{properties}</w:pPr>'
+    if not properties and not runs:
+        return '<w:p/>'
+    return f'<w:p>{properties}{runs}</w:p>'
+
+
+def _run(text, properties='', force=False):
+    """
+    One run, or '' for empty text unless force is set (python-docx only
+    skips the run when add_paragraph() is given empty text, not add_run())
+    """
+    if not text and not force:
+        return ''
+    if _INVALID_XML_CHARS.search(text):
+        raise ValueError('All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters')
+
+    # Tabs and line breaks become their own elements, as python-docx does
+    content = []
+    for piece in _RUN_SPECIAL_CHARS.split(text):
+        if piece == '\t':
+            content.append('<w:tab/>')
+        elif piece in ('\r', '\n'):
+            content.append('<w:br/>')
+        elif piece:
+            content.append(_text_element(piece))
+    content = ''.join(content)
+
+    if properties:
+        properties = f'<w:rPr>{properties}</w:rPr>'
+    if not properties and not content:
+        return '<w:r/>'
+    return f'<w:r>{properties}{content}</w:r>'
+
+
+def _text_element(text):
+    escaped = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if len(text.strip()) < len(text):
+        return f'<w:t xml:space="preserve">{escaped}</w:t>'
+    return f'<w:t>{escaped}</w:t>'
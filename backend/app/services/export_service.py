@@ -0,0 +1,120 @@
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.utils import secure_filename
+from config import Config
+from app.models.proposal import ProposalStatus
+from app.services.artifact_service import ArtifactService
+from app.services.document_service import DocumentService
+from app.services.render_engine import RenderQueueFull
+from app.services.render_themes import DEFAULT_THEME
+from app.services.renderer_registry import get_renderer, renderer_names
+
+# Every registered format can be exported
+EXPORT_EXTENSIONS = {name: get_renderer(name).extension for name in renderer_names()}
+
+
+class _ZipStream:
+    """Write-only, non-seekable sink that hands zip bytes to a generator as they are produced"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        if data:
+            self._chunks.append(bytes(data))
+            self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b''.join(chunks)
+
+
+class ExportService:
+    """Bulk export of rendered proposals as a streamed ZIP archive"""
+
+    @staticmethod
+    def stream_zip(proposals, formats, concurrency=None):
+        """
+        Yield a ZIP archive chunk by chunk.
+
+        Entries are rendered on a small thread pool (the heavy lifting happens
+        in the render engine) with at most `concurrency` documents in flight,
+        and written to the archive in query order as soon as each is ready.
+        """
+        concurrency = concurrency or Config.EXPORT_RENDER_CONCURRENCY
+        sink = _ZipStream()
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='export-render') as executor:
+            # Files are already compressed, so store them as-is
+            with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+                for proposal in proposals:
+                    for fmt in formats:
+                        name = ExportService._entry_name(proposal, fmt)
+                        pending.append((name, executor.submit(ExportService.load_document, proposal, fmt)))
+
+                        # Keep a bounded window of renders in flight
+                        while len(pending) >= concurrency:
+                            yield ExportService._write_entry(archive, sink, *pending.popleft())
+
+                while pending:
+                    yield ExportService._write_entry(archive, sink, *pending.popleft())
+
+            # Central directory
+            yield sink.drain()
+
+    @staticmethod
+    def _write_entry(archive, sink, name, future):
+        try:
+            data = future.result()
+        except Exception as e:
+            print(f"Export render error for {name}: {e}")
+            name = f'{name}.error.txt'
+            data = f'Failed to render document: {e}'.encode('utf-8')
+
+        info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        archive.writestr(info, data)
+        return sink.drain()
+
+    @staticmethod
+    def load_document(proposal, fmt, theme=DEFAULT_THEME):
+        """Return document bytes, preferring stored artifacts and cached renders"""
+        if theme == DEFAULT_THEME and proposal.status == ProposalStatus.APPROVED.value:
+            data = ArtifactService.read_artifact(proposal, fmt)
+            if data is not None:
+                return data
+
+        deadline = time.monotonic() + Config.RENDER_ENGINE_TIMEOUT
+        while True:
+            try:
+                return DocumentService.render_bytes(
+                    fmt,
+                    proposal.json_content,
+                    proposal.title,
+                    proposal_id=proposal.id,
+                    theme=theme
+                )
+            except RenderQueueFull as e:
+                # Export is a background-style workload; wait for the engine instead of failing
+                if time.monotonic() + e.retry_after > deadline:
+                    raise
+                time.sleep(e.retry_after)
+
+    @staticmethod
+    def _entry_name(proposal, fmt):
+        """Archive path: <bd username>/<title>_<short id>.<ext>"""
+        bd = proposal.business_developer
+        folder = (secure_filename(bd.username) if bd else '') or 'unassigned'
+        title = secure_filename(proposal.title) or 'proposal'
+        return f'{folder}/{title}_{str(proposal.id)[-8:]}.{EXPORT_EXTENSIONS[fmt]}'
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """
+    In-process LRU of rendered document fragments (one per proposal section).
+
+    Entries are renderer-specific objects such as PDF flowables or Word XML
+    elements, so they are never shared between processes. Callers must treat
+    cached fragments as read-only and copy them before use.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        """Return the fragment for key, calling build() on a miss"""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        fragment = build()
+
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = fragment
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,92 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from config import Config
+from app.models.generated_template import GeneratedTemplate
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class GenerationCache:
+    """
+    Cache of LLM-generated proposal templates, keyed by the normalized
+    project description plus everything else that shapes the output (model,
+    prompt version, temperature).
+
+    Entries live in a MongoDB collection with a TTL index so they are shared
+    by every process and BD; a small in-process LRU answers repeats without a
+    database round trip. Only successful generations are stored, never mock
+    fallbacks. Callers get their own copy of each template.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def normalize(description):
+        """Case, Unicode form and whitespace differences do not change the job post"""
+        return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', description)).strip().casefold()
+
+    @staticmethod
+    def make_key(description, model, prompt_version, temperature):
+        canonical = json.dumps(
+            [GenerationCache.normalize(description), model, prompt_version, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached template for key, or None"""
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(template)
+
+        try:
+            # The TTL monitor only runs every minute, so check expiry here too
+            stored = GeneratedTemplate.objects(key=key, expires_at__gt=datetime.utcnow()).first()
+        except Exception as e:
+            print(f"Generation cache read failed: {e}")
+            return None
+        if stored is None:
+            return None
+
+        self._remember(key, stored.json_content)
+        return copy.deepcopy(stored.json_content)
+
+    def put(self, key, template, model, prompt_version, temperature):
+        """Store a freshly generated template"""
+        self._remember(key, copy.deepcopy(template))
+        try:
+            GeneratedTemplate.objects(key=key).update_one(
+                set__model=model,
+                set__prompt_version=prompt_version,
+                set__temperature=temperature,
+                set__json_content=template,
+                set__created_at=datetime.utcnow(),
+                set__expires_at=datetime.utcnow() + timedelta(seconds=self.ttl),
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Generation cache write failed: {e}")
+
+    def _remember(self, key, template):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+generation_cache = GenerationCache(Config.GENERATION_CACHE_ENTRIES, Config.GENERATION_CACHE_TTL)
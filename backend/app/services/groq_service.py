@@ -1,51 +1,42 @@
-import os
 import json
-from groq import Groq
+import time
+from config import Config
+from app.services.llm_gateway import llm_gateway, LLMUnavailable, LLMRateLimited
+from app.services.llm_scheduler import llm_scheduler, estimate_tokens, LLMDeadlineExceeded, PRIORITY_DRAFT, PRIORITY_REVISION
+from app.services.generation_cache import generation_cache
+from app.services.section_stream import SectionParser
+
+# Bump whenever the generation prompt changes so cached templates are not reused
+PROMPT_VERSION = '1'
+TEMPERATURE = 0.7
+MAX_TOKENS = 2048
 
 class GroqService:
-    def __init__(self):
-        api_key = os.environ.get('GROQ_API_KEY')
-        if not api_key:
+    def __init__(self, gateway=None, scheduler=None):
+        # Connections, retries and the circuit breaker live in the shared gateway
+        self.gateway = gateway or llm_gateway
+        # Calls wait here for rate limit budget, revisions first
+        self.scheduler = scheduler or llm_scheduler
+        if not self.gateway.configured:
             print("Warning: GROQ_API_KEY not found. Using mock responses.")
-            self.client = None
-        else:
-            self.client = Groq(api_key=api_key)
     
-    def generate_proposal_template(self, project_description):
+    def generate_proposal_template(self, project_description, fresh=False):
         """
-        Generate a proposal JSON template using GROQ API
+        Generate a proposal JSON template using GROQ API.
+        Templates for the same (normalized) description are served from the
+        generation cache unless fresh is set.
         """
         try:
-            if not self.client:
+            if not self.gateway.configured:
                 return self._get_mock_proposal_template(project_description)
             
-            prompt = f"""
-            Generate a structured JSON template for an Upwork proposal based on this project description:
-            {project_description}
-            
-            The JSON should include sections for:
-            - introduction: A compelling opening paragraph
-            - understanding: Your understanding of the project requirements
-            - proposed_solution: Detailed solution approach with steps
-            - timeline: Estimated timeline with phases
-            - budget: Budget breakdown with justification
-            - why_choose_us: Why you're the best choice for this project
-            - portfolio_examples: Relevant experience or examples
-            - questions: Any clarifying questions for the client
-            
-            Return only valid JSON without any additional text or markdown formatting.
-            Make it professional and tailored to the specific project description.
-            """
+            cache_key = generation_cache.make_key(project_description, self.gateway.model, PROMPT_VERSION, TEMPERATURE)
+            if not fresh:
+                cached = generation_cache.get(cache_key)
+                if cached is not None:
+                    return cached
             
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-70b-8192",
-                temperature=0.7,
-                max_tokens=2048
-            )
-            
-            # Extract JSON from response
-            content = response.choices[0].message.content.strip()
+            content = self._complete(self._template_prompt(project_description), PRIORITY_DRAFT).strip()
             
             # Remove any markdown formatting if present
             if content.startswith('```json'):
@@ -55,21 +46,95 @@ class GroqService:
             
             # Parse JSON
             proposal_json = json.loads(content)
+            if isinstance(proposal_json, dict):
+                generation_cache.put(cache_key, proposal_json, self.gateway.model, PROMPT_VERSION, TEMPERATURE)
             return proposal_json
             
         except json.JSONDecodeError as e:
             print(f"JSON parsing error: {e}")
             return self._get_mock_proposal_template(project_description)
+        except LLMUnavailable as e:
+            print(f"GROQ unavailable, using mock template: {e}")
+            return self._get_mock_proposal_template(project_description)
         except Exception as e:
             print(f"GROQ API Error: {e}")
             return self._get_mock_proposal_template(project_description)
     
+    def stream_proposal_template(self, project_description, fresh=False):
+        """
+        Generate a proposal JSON template section by section.
+
+        Yields ('section', (key, value)) as each top-level section of the
+        streamed completion closes. If the stream fails after sections were
+        sent, ('reset', None) is yielded and the consumer should start over
+        with the sections of the next attempt, or of the mock template once
+        GROQ_DEADLINE has passed. A cached template is replayed as sections.
+        """
+        if not self.gateway.configured:
+            yield from self._sections(self._get_mock_proposal_template(project_description))
+            return
+        
+        cache_key = generation_cache.make_key(project_description, self.gateway.model, PROMPT_VERSION, TEMPERATURE)
+        if not fresh:
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                yield from self._sections(cached)
+                return
+        
+        prompt = self._template_prompt(project_description)
+        estimate = estimate_tokens(prompt) + MAX_TOKENS
+        deadline = time.monotonic() + Config.GROQ_DEADLINE
+        proposal_json = {}
+        while True:
+            try:
+                self.scheduler.acquire(estimate, PRIORITY_DRAFT, deadline)
+            except LLMDeadlineExceeded as e:
+                print(f"GROQ rate limited, using mock template: {e}")
+                break
+            
+            parser = SectionParser()
+            streamed = []
+            try:
+                for chunk in self.gateway.stream(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS
+                ):
+                    streamed.append(chunk)
+                    for key, value in parser.feed(chunk):
+                        proposal_json[key] = value
+                        yield 'section', (key, value)
+                if not parser.complete or not proposal_json:
+                    raise ValueError('streamed completion is not a complete JSON object')
+            except LLMUnavailable as e:
+                error = e
+            except Exception as e:
+                print(f"GROQ API Error while streaming: {e}")
+                break
+            else:
+                generation_cache.put(cache_key, proposal_json, self.gateway.model, PROMPT_VERSION, TEMPERATURE)
+                return
+            finally:
+                self.scheduler.settle(estimate, estimate_tokens(prompt) + estimate_tokens(''.join(streamed)))
+            
+            if isinstance(error, LLMRateLimited) and self._wait_out_rate_limit(error, deadline):
+                if proposal_json:
+                    proposal_json = {}
+                    yield 'reset', None
+                continue
+            print(f"GROQ unavailable, using mock template: {error}")
+            break
+        
+        if proposal_json:
+            yield 'reset', None
+        yield from self._sections(self._get_mock_proposal_template(project_description))
+    
     def regenerate_proposal(self, current_json, admin_recommendations, bd_recommendations):
         """
         Regenerate proposal JSON with admin recommendations and BD input
         """
         try:
-            if not self.client:
+            if not self.gateway.configured:
                 return self._get_improved_mock_proposal(current_json, admin_recommendations, bd_recommendations)
             
             prompt = f"""
@@ -85,15 +150,7 @@ class GroqService:
             Return only valid JSON without any additional text or markdown formatting.
             """
             
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-70b-8192",
-                temperature=0.7,
-                max_tokens=2048
-            )
-            
-            # Extract and parse JSON
-            content = response.choices[0].message.content.strip()
+            content = self._complete(prompt, PRIORITY_REVISION).strip()
             
             # Remove any markdown formatting if present
             if content.startswith('```json'):
@@ -107,10 +164,73 @@ class GroqService:
         except json.JSONDecodeError as e:
             print(f"JSON parsing error during regeneration: {e}")
             return self._get_improved_mock_proposal(current_json, admin_recommendations, bd_recommendations)
+        except LLMUnavailable as e:
+            print(f"GROQ unavailable during regeneration, using mock proposal: {e}")
+            return self._get_improved_mock_proposal(current_json, admin_recommendations, bd_recommendations)
         except Exception as e:
             print(f"GROQ API Error during regeneration: {e}")
             return self._get_improved_mock_proposal(current_json, admin_recommendations, bd_recommendations)
     
+    def _complete(self, prompt, priority):
+        """
+        Completion text for a prompt, sent when the rate limits allow. A call
+        that is still queued, or still rate limited by the provider, at
+        GROQ_DEADLINE raises LLMUnavailable; so does an open circuit or a
+        provider that keeps failing, straight away. Either way the caller
+        falls back to mock content.
+        """
+        estimate = estimate_tokens(prompt) + MAX_TOKENS
+        deadline = time.monotonic() + Config.GROQ_DEADLINE
+        while True:
+            self.scheduler.acquire(estimate, priority, deadline)
+            try:
+                content = self.gateway.complete(
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS
+                )
+            except LLMUnavailable as e:
+                # Nothing was generated; only the prompt may have counted
+                self.scheduler.settle(estimate, estimate_tokens(prompt))
+                if isinstance(e, LLMRateLimited) and self._wait_out_rate_limit(e, deadline):
+                    continue
+                raise
+            self.scheduler.settle(estimate, estimate_tokens(prompt) + estimate_tokens(content))
+            return content
+    
+    def _wait_out_rate_limit(self, error, deadline):
+        """Sleep as long as the provider asked before trying again; False if that ends past the deadline"""
+        delay = error.retry_after if error.retry_after is not None else self.gateway.backoff_max
+        delay = max(delay, self.gateway.backoff_base)
+        if time.monotonic() + delay >= deadline:
+            return False
+        print(f"GROQ rate limited, retrying in {delay:.1f}s: {error}")
+        time.sleep(delay)
+        return True
+    
+    def _template_prompt(self, project_description):
+        return f"""
+            Generate a structured JSON template for an Upwork proposal based on this project description:
+            {project_description}
+            
+            The JSON should include sections for:
+            - introduction: A compelling opening paragraph
+            - understanding: Your understanding of the project requirements
+            - proposed_solution: Detailed solution approach with steps
+            - timeline: Estimated timeline with phases
+            - budget: Budget breakdown with justification
+            - why_choose_us: Why you're the best choice for this project
+            - portfolio_examples: Relevant experience or examples
+            - questions: Any clarifying questions for the client
+            
+            Return only valid JSON without any additional text or markdown formatting.
+            Make it professional and tailored to the specific project description.
+            """
+    
+    def _sections(self, proposal_json):
+        for key, value in proposal_json.items():
+            yield 'section', (key, value)
+    
     def _get_mock_proposal_template(self, project_description):
         """Fallback mock template when GROQ API is unavailable"""
         return {
@@ -152,4 +272,8 @@ class GroqService:
         if 'introduction' in improved_json:
             improved_json['introduction'] = improved_json['introduction'] + " [REVISED BASED ON FEEDBACK]"
         
-        return improved_json
\ No newline at end of file
+        return improved_json
+
+
+# Shared by all requests; the gateway underneath pools connections
+groq_service = GroqService()
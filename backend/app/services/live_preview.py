@@ -0,0 +1,34 @@
+import threading
+from contextlib import contextmanager
+
+
+class LivePreviews:
+    """
+    Tracks the newest live preview render per (user, proposal). Starting a
+    preview cancels the one it supersedes, so a burst of edits only keeps
+    the latest render queued on the render engine.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = {}  # (user id, proposal id) -> cancellation event
+
+    @contextmanager
+    def track(self, user_id, proposal_id):
+        """Yield a threading.Event that is set once a newer preview starts for the same key"""
+        key = (str(user_id), str(proposal_id))
+        cancelled = threading.Event()
+        with self._lock:
+            previous = self._current.get(key)
+            self._current[key] = cancelled
+        if previous is not None:
+            previous.set()
+        try:
+            yield cancelled
+        finally:
+            with self._lock:
+                if self._current.get(key) is cancelled:
+                    del self._current[key]
+
+
+live_previews = LivePreviews()
@@ -0,0 +1,222 @@
+import os
+import random
+import threading
+import time
+import httpx
+from groq import Groq, APIConnectionError, APIStatusError
+from config import Config
+
+# Statuses worth retrying: rate limiting and provider-side failures
+RETRYABLE_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+
+class LLMUnavailable(Exception):
+    """Raised when the LLM provider is unconfigured, degraded or out of retries"""
+
+
+class LLMRateLimited(LLMUnavailable):
+    """Raised when retries ran out on 429 responses; the provider is up but throttling"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds the provider asked to wait, if it said
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After failure_threshold failed calls
+    the circuit opens and calls fail fast for reset_timeout seconds; then a
+    single trial call is let through (half-open) and decides whether to close
+    it again.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+
+class LLMGateway:
+    """
+    Process-wide access to the chat completion API.
+
+    One Groq client over a pooled keep-alive httpx connection pool is shared
+    by all requests, with explicit connect/read timeouts. Rate-limit and
+    server errors are retried with jittered exponential backoff; repeated
+    failures open a circuit breaker so callers fall back to mock content
+    immediately instead of waiting on a degraded provider. base_url can
+    point at a local fake server.
+    """
+
+    def __init__(self, api_key, base_url=None, model='llama3-70b-8192', connect_timeout=5, read_timeout=60,
+                 max_connections=20, max_retries=3, backoff_base=0.5, backoff_max=8,
+                 breaker_threshold=5, breaker_reset=30):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def configured(self):
+        return bool(self.api_key)
+
+    def complete(self, messages, **params):
+        """
+        Return the text of a chat completion. Raises LLMUnavailable when the
+        gateway is unconfigured, the circuit is open, or retries run out;
+        other API errors (e.g. 400, 401) are raised as-is.
+        """
+        response = self._create(messages, **params)
+        self.breaker.record_success()
+        return response.choices[0].message.content
+
+    def stream(self, messages, **params):
+        """
+        Yield the text of a chat completion as it is generated. Starting the
+        stream is retried like complete(); if it breaks off part-way the
+        caller has already used some text, so LLMUnavailable is raised
+        instead of retrying.
+        """
+        stream = self._create(messages, stream=True, **params)
+        failed = False
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except (APIConnectionError, APIStatusError, httpx.HTTPError) as e:
+            failed = True
+            self.breaker.record_failure()
+            raise LLMUnavailable(f'LLM stream broke off: {e}') from e
+        finally:
+            stream.close()
+            # Also reached when the caller stops early, which says nothing bad about the provider
+            if not failed:
+                self.breaker.record_success()
+
+    def _create(self, messages, **params):
+        """Send a chat completion request with retries; failures are recorded on the breaker"""
+        if not self.configured:
+            raise LLMUnavailable('GROQ_API_KEY is not configured')
+        if not self.breaker.allow():
+            raise LLMUnavailable('LLM provider is degraded; circuit breaker is open')
+
+        params.setdefault('model', self.model)
+        attempt = 0
+        while True:
+            try:
+                return self._get_client().chat.completions.create(messages=messages, **params)
+            except (APIConnectionError, APIStatusError) as e:
+                status = getattr(e, 'status_code', None)  # None for connection errors and timeouts
+                if status is not None and status not in RETRYABLE_STATUSES:
+                    # The request itself is wrong; the provider is healthy
+                    self.breaker.record_success()
+                    raise
+                if attempt >= self.max_retries:
+                    if status == 429:
+                        # Throttling is not a fault; it must not open the circuit
+                        self.breaker.record_success()
+                        raise LLMRateLimited(f'LLM rate limited after {attempt + 1} attempts: {e}',
+                                             self._retry_after(e)) from e
+                    self.breaker.record_failure()
+                    raise LLMUnavailable(f'LLM request failed after {attempt + 1} attempts: {e}') from e
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    def close(self):
+        """Close pooled connections"""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = Groq(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        http_client=httpx.Client(timeout=self.timeout, limits=self.limits),
+                        max_retries=0  # Retries are handled here so the breaker sees them
+                    )
+        return self._client
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff, or the server's Retry-After if it asks for longer"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _retry_after(self, error):
+        """Seconds from the error response's Retry-After header, or None"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return None
+
+
+llm_gateway = LLMGateway(
+    # Config.GROQ_API_KEY has a placeholder default; only a real key enables the API
+    api_key=os.environ.get('GROQ_API_KEY'),
+    base_url=Config.GROQ_BASE_URL,
+    model=Config.GROQ_MODEL,
+    connect_timeout=Config.GROQ_CONNECT_TIMEOUT,
+    read_timeout=Config.GROQ_READ_TIMEOUT,
+    max_connections=Config.GROQ_MAX_CONNECTIONS,
+    max_retries=Config.GROQ_MAX_RETRIES,
+    backoff_base=Config.GROQ_BACKOFF_BASE,
+    backoff_max=Config.GROQ_BACKOFF_MAX,
+    breaker_threshold=Config.GROQ_BREAKER_THRESHOLD,
+    breaker_reset=Config.GROQ_BREAKER_RESET
+)
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from config import Config
+from app.services import metrics
+from app.services.llm_gateway import LLMUnavailable
+
+# Lower runs first: revisions are waited on by a reviewer, new drafts fill in in the background
+PRIORITY_REVISION = 0
+PRIORITY_DRAFT = 1
+PRIORITY_NAMES = {PRIORITY_REVISION: 'revision', PRIORITY_DRAFT: 'draft'}
+
+# Rough size of a token in English prose
+CHARS_PER_TOKEN = 4
+
+
+class LLMDeadlineExceeded(LLMUnavailable):
+    """Raised when a call could not be scheduled before its deadline"""
+
+
+def estimate_tokens(text):
+    """Token count estimated from the text size"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Budget of units per minute, refilled continuously up to one minute's
+    worth. A limit of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def delay(self, amount, now):
+        """Seconds until amount can be taken (0 if now)"""
+        if not self.capacity:
+            return 0
+        self._refill(now)
+        # A call bigger than the whole budget waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        return max(0, (amount - self.level) / self.rate)
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Give back (positive) or charge (negative) units once the real usage is known"""
+        if self.capacity:
+            self.level = min(self.capacity, self.level + amount)
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls within the provider's requests-per-minute and
+    tokens-per-minute limits.
+
+    Callers queue by priority (then arrival) and only the head of the queue
+    may take budget, so a large draft cannot be overtaken forever by small
+    ones and revisions always go first. A call that is still queued at its
+    deadline gets LLMDeadlineExceeded. Limits are per process; divide the
+    provider's limits by the number of worker processes.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._condition = threading.Condition()
+        self._queue = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+
+    def acquire(self, tokens, priority, deadline):
+        """Block until the call may be sent; deadline is a time.monotonic() value"""
+        entry = (priority, next(self._sequence))
+        queued_at = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = None  # Not at the head: wait to be notified
+                    if self._queue[0] is entry:
+                        delay = max(self.requests.delay(1, now), self.tokens.delay(tokens, now))
+                        if delay <= 0:
+                            heapq.heappop(self._queue)
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self._condition.notify_all()
+                            break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise LLMDeadlineExceeded(
+                            f'LLM call still queued after {now - queued_at:.1f}s; deadline expired'
+                        )
+                    self._condition.wait(remaining if delay is None else min(delay, remaining))
+            except BaseException:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                self._observe_wait(queued_at, priority, 'expired')
+                raise
+        self._observe_wait(queued_at, priority, 'scheduled')
+
+    def settle(self, estimated, actual):
+        """Correct the token budget of a finished call from its estimate to its actual size"""
+        with self._condition:
+            self.tokens.adjust(estimated - actual)
+            self._condition.notify_all()
+
+    def queue_depth(self):
+        """{labels: calls waiting} per priority, for the metrics gauge"""
+        with self._condition:
+            priorities = [priority for priority, _ in self._queue]
+        return {
+            (('priority', name),): priorities.count(priority)
+            for priority, name in PRIORITY_NAMES.items()
+        }
+
+    def _observe_wait(self, queued_at, priority, outcome):
+        metrics.observe(
+            'llm_queue_wait_seconds',
+            time.monotonic() - queued_at,
+            priority=PRIORITY_NAMES.get(priority, str(priority)),
+            outcome=outcome
+        )
+
+
+llm_scheduler = LLMScheduler(Config.GROQ_REQUESTS_PER_MINUTE, Config.GROQ_TOKENS_PER_MINUTE)
+
+metrics.register_histogram('llm_queue_wait_seconds', 'Time LLM calls waited for rate limit budget', metrics.QUEUE_BUCKETS)
+metrics.register_gauge('llm_queue_depth', 'LLM calls waiting for rate limit budget', llm_scheduler.queue_depth)
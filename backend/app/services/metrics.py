@@ -0,0 +1,146 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds, tuned for render phases from sub-millisecond lookups to multi-second layouts
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+PAGE_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+# Seconds spent queued for the LLM, up to a couple of minutes under rate limiting
+QUEUE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+PHASE_METRIC = 'render_phase_seconds'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # labels tuple -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._series[labels] = series
+            series[index] += 1
+            series[-1] += value
+
+    def exposition(self):
+        """Prometheus text format lines for this histogram"""
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {values[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Gauge read when scraped; read() returns {labels tuple: value}"""
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def exposition(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge']
+        for labels, value in sorted(self.read().items()):
+            lines.append(f'{self.name}{_format_labels(labels)} {value}')
+        return lines
+
+
+_histograms = {}
+_gauges = {}
+_local = threading.local()
+
+
+def register_histogram(name, help_text, buckets):
+    _histograms[name] = Histogram(name, help_text, buckets)
+
+
+def register_gauge(name, help_text, read):
+    _gauges[name] = Gauge(name, help_text, read)
+
+
+def observe(name, value, **labels):
+    """
+    Record a value in a histogram, and in the current collection if one is
+    active on this thread (see collecting()).
+    """
+    labels = tuple(sorted(labels.items()))
+    _histograms[name].observe(value, labels)
+    collection = getattr(_local, 'collection', None)
+    if collection is not None:
+        collection.append((name, value, labels))
+
+
+@contextmanager
+def phase(name):
+    """Time a block of code as a render phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(PHASE_METRIC, time.perf_counter() - start, phase=name)
+
+
+def start_collection():
+    """Start buffering this thread's observations, e.g. for one request or one worker render"""
+    _local.collection = []
+
+
+def stop_collection():
+    """Stop buffering and return the (metric, value, labels) observations"""
+    collection = getattr(_local, 'collection', None)
+    _local.collection = None
+    return collection or []
+
+
+def replay(observations):
+    """Record observations made in another process (render workers) in this one"""
+    for name, value, labels in observations:
+        observe(name, value, **dict(labels))
+
+
+def server_timing(observations):
+    """Server-Timing header value summing phase durations, in order of first appearance"""
+    totals = {}
+    for name, value, labels in observations:
+        if name == PHASE_METRIC:
+            phase_name = dict(labels)['phase']
+            totals[phase_name] = totals.get(phase_name, 0) + value
+    return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in totals.items())
+
+
+def exposition():
+    """All metrics in the Prometheus text format"""
+    lines = []
+    series = {**_histograms, **_gauges}
+    for name in sorted(series):
+        lines.extend(series[name].exposition())
+    return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+register_histogram(PHASE_METRIC, 'Time spent in each document rendering phase', TIME_BUCKETS)
+register_histogram('render_output_bytes', 'Size of rendered documents', SIZE_BUCKETS)
+register_histogram('render_pages', 'Page count of rendered PDF documents', PAGE_BUCKETS)
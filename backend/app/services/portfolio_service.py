@@ -0,0 +1,148 @@
+import tempfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+from pypdf import PdfReader, PdfWriter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from config import Config
+from app.services.export_service import ExportService
+from app.services.document_spool import inflight_bytes, new_spool
+from app.services.render_themes import get_theme, DEFAULT_THEME
+
+
+class PortfolioService:
+    """
+    Combine several proposals into one PDF "portfolio book".
+
+    Each proposal's existing PDF (stored artifact or cached render) is spooled
+    to a temporary file and its pages are copied into the output; only the
+    small cover and contents pages are laid out with reportlab. The writer
+    holds a copy of every appended page until the merged PDF is written, so
+    the total size of the sources is checked against and counted towards the
+    in-flight document bytes before merging. The merged PDF is written to a
+    SpooledDocument, so it spills to disk like any other render.
+    """
+
+    @staticmethod
+    def build(proposals, title="Proposal Portfolio", include_cover=True, include_toc=True, theme=DEFAULT_THEME,
+              cover_date=None):
+        """
+        Return the merged portfolio PDF as a SpooledDocument. The cover is
+        dated cover_date, by default the latest proposal update, so the same
+        proposals give the same bytes. Raises RenderQueueFull if the sources
+        do not fit in the in-flight document budget.
+        """
+        inflight_bytes.check()
+        theme_name = theme
+        theme = get_theme(theme)
+        if cover_date is None:
+            cover_date = max((proposal.updated_at for proposal in proposals if proposal.updated_at), default=None)
+        spooled = []
+        held = 0
+        try:
+            # Fetch every proposal PDF once into a temporary file
+            total = 0
+            for proposal in proposals:
+                data = ExportService.load_document(proposal, 'pdf', theme_name)
+                total += len(data)
+                page_count = len(PdfReader(BytesIO(data)).pages)
+                spool = tempfile.TemporaryFile()
+                spool.write(data)
+                spool.seek(0)
+                spooled.append((proposal.title, page_count, spool))
+
+            # The writer keeps a copy of every page it appends, so all the sources are in memory at once while merging
+            inflight_bytes.check(total)
+            inflight_bytes.add(total)
+            held = total
+
+            writer = PdfWriter()
+
+            if include_cover:
+                PortfolioService._append_pdf(writer, PortfolioService._cover_pdf(title, len(spooled), cover_date, theme))
+
+            first_page = len(writer.pages) + 1
+            if include_toc and spooled:
+                toc_pdf = PortfolioService._toc_pdf(spooled, first_page, theme)
+                PortfolioService._append_pdf(writer, toc_pdf)
+
+            for proposal_title, _, spool in spooled:
+                writer.append(PdfReader(spool), outline_item=proposal_title)
+
+            writer.add_metadata({'/Title': title})
+            output = new_spool()
+            try:
+                writer.write(output)
+            except Exception:
+                output.close()
+                raise
+            output.finish()
+            return output
+        finally:
+            inflight_bytes.release(held)
+            for _, _, spool in spooled:
+                spool.close()
+
+    @staticmethod
+    def _append_pdf(writer, data):
+        writer.append(PdfReader(BytesIO(data)))
+
+    @staticmethod
+    def _cover_pdf(title, proposal_count, cover_date, theme):
+        styles = theme.pdf_styles()
+        buffer = BytesIO()
+        doc = PortfolioService._doc_template(buffer, theme)
+        story = [
+            Spacer(1, 200),
+            Paragraph(escape(title), styles['title']),
+            Paragraph(f"{proposal_count} proposal{'s' if proposal_count != 1 else ''}", styles['heading'])
+        ]
+        if cover_date:
+            story.append(Paragraph(cover_date.strftime('%B %d, %Y'), styles['body']))
+        doc.build(story)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _toc_pdf(spooled, first_page, theme):
+        """
+        Build the contents pages. Their own length shifts every page number,
+        so lay them out again until the page count is stable.
+        """
+        toc_pages = 1
+        for _ in range(5):
+            data = PortfolioService._toc_pdf_with_offset(spooled, first_page + toc_pages, theme)
+            actual_pages = len(PdfReader(BytesIO(data)).pages)
+            if actual_pages == toc_pages:
+                break
+            toc_pages = actual_pages
+        return data
+
+    @staticmethod
+    def _toc_pdf_with_offset(spooled, start_page, theme):
+        styles = theme.pdf_styles()
+        rows = []
+        page = start_page
+        for proposal_title, page_count, _ in spooled:
+            rows.append([Paragraph(escape(proposal_title), styles['body']), str(page)])
+            page += page_count
+
+        buffer = BytesIO()
+        doc = PortfolioService._doc_template(buffer, theme)
+        table = Table(rows, colWidths=[doc.width - 60, 60])
+        table.setStyle(TableStyle([
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP')
+        ]))
+        doc.build([Paragraph('Contents', styles['heading']), table])
+        return buffer.getvalue()
+
+    @staticmethod
+    def _doc_template(buffer, theme):
+        return SimpleDocTemplate(
+            buffer,
+            pagesize=theme.pdf_page_size,
+            rightMargin=theme.pdf_margin,
+            leftMargin=theme.pdf_margin,
+            topMargin=theme.pdf_margin,
+            bottomMargin=theme.pdf_margin,
+            invariant=int(Config.RENDER_DETERMINISTIC)
+        )
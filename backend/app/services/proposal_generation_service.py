@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from config import Config
+from app.models.proposal import Proposal, ProposalStatus
+from app.services.groq_service import groq_service
+
+# Generation threads spend nearly all their time waiting on the LLM API
+_executor = ThreadPoolExecutor(
+    max_workers=Config.GENERATION_WORKERS,
+    thread_name_prefix='proposal-generation'
+)
+
+class ProposalGenerationService:
+    """
+    Fills in the content of proposals created in the generating state.
+
+    Creation returns as soon as the proposal is saved; the LLM round-trip
+    runs on this worker pool, which moves the proposal to draft with its
+    generated content, or to generation_failed with the error.
+
+    A generating proposal is owned by the process holding its lease
+    (generation_lease_until); proposals whose lease ran out, e.g. because
+    their process died, are taken over by resume_pending().
+    """
+
+    _lock = threading.Lock()
+    _resumed = False
+
+    @staticmethod
+    def new_lease():
+        """Lease expiry for a proposal this process starts generating now"""
+        return datetime.utcnow() + timedelta(seconds=Config.GENERATION_LEASE)
+
+    @staticmethod
+    def submit(proposal, fresh=False):
+        """Queue content generation for a saved generating proposal created with new_lease()"""
+        _executor.submit(ProposalGenerationService._run, str(proposal.id), fresh)
+
+    @staticmethod
+    def resume_pending():
+        """
+        Take over proposals left generating by a process that is gone (runs
+        once, at startup). Each one is claimed with a conditional update, so
+        with several processes only one picks it up.
+        """
+        with ProposalGenerationService._lock:
+            if ProposalGenerationService._resumed:
+                return
+            ProposalGenerationService._resumed = True
+        try:
+            now = datetime.utcnow()
+            pending = Proposal.objects(status=ProposalStatus.GENERATING.value).only('id', 'generation_lease_until')
+            for proposal in pending:
+                if proposal.generation_lease_until and proposal.generation_lease_until > now:
+                    continue
+                claimed = Proposal.objects(
+                    id=proposal.id,
+                    status=ProposalStatus.GENERATING.value,
+                    generation_lease_until=proposal.generation_lease_until
+                ).update_one(set__generation_lease_until=ProposalGenerationService.new_lease())
+                if claimed:
+                    _executor.submit(ProposalGenerationService._run, str(proposal.id), False)
+        except Exception as e:
+            print(f"Failed to resume proposal generation: {e}")
+
+    @staticmethod
+    def _run(proposal_id, fresh):
+        """Worker entry point: generate the content and record the outcome"""
+        try:
+            proposal = Proposal.objects(
+                id=proposal_id,
+                status=ProposalStatus.GENERATING.value
+            ).only('id', 'project_description').first()
+            if not proposal:
+                return
+
+            try:
+                json_content = groq_service.generate_proposal_template(proposal.project_description, fresh=fresh)
+                if not isinstance(json_content, dict) or not json_content:
+                    raise ValueError('Generated template is not a JSON object')
+                update = {
+                    'set__json_content': json_content,
+                    'set__status': ProposalStatus.DRAFT.value,
+                    'unset__generation_error': True
+                }
+            except Exception as e:
+                print(f"Proposal generation {proposal_id} failed: {e}")
+                update = {
+                    'set__status': ProposalStatus.GENERATION_FAILED.value,
+                    'set__generation_error': str(e)
+                }
+
+            # Conditional on the status so a proposal deleted meanwhile is not touched
+            Proposal.objects(id=proposal_id, status=ProposalStatus.GENERATING.value).update_one(
+                set__updated_at=datetime.utcnow(),
+                unset__generation_lease_until=True,
+                **update
+            )
+        except Exception as e:
+            print(f"Proposal generation {proposal_id} error: {e}")
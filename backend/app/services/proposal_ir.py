@@ -0,0 +1,306 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from config import Config
+
+# Block kinds
+HEADING = 'heading'      # level 0 = document title, 1 = section, 2+ = nested key
+PARAGRAPH = 'paragraph'
+FIELD = 'field'          # "Label: text" key-value line
+BULLET = 'bullet'
+TRUNCATED = 'truncated'  # Marker for content dropped by a render budget; label = budget name
+
+# Sections that are never rendered into documents
+SKIPPED_SECTIONS = ('revision_notes',)
+
+# Render budget names
+DEPTH_BUDGET = 'depth'
+NODES_BUDGET = 'nodes'
+CHARS_BUDGET = 'chars'
+PAGES_BUDGET = 'pages'
+
+Block = namedtuple('Block', ['kind', 'level', 'text', 'label'])
+
+# A compiled section: its blocks, what they cost, and budgets hit while walking it
+_CompiledSection = namedtuple('_CompiledSection', ['blocks', 'nodes', 'chars', 'exceeded'])
+
+_MEMO_SIZE = 1024  # Sections
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+_END = object()
+
+# Containers nested deeper than this are turned into text before anything
+# else (hashing, pickling to render workers) touches them; recursive
+# serializers fail on structures nested ~1000 deep
+MAX_NESTING = 64
+
+
+class RenderBudget:
+    """
+    Limits on how much of a proposal is turned into blocks.
+
+    Model output is untrusted: deeply nested values beyond max_depth are
+    flattened into one line, single values longer than max_block_chars are
+    cut short, and once max_nodes blocks or max_chars characters have been
+    emitted the rest of the proposal is replaced by a marker.
+    """
+
+    def __init__(self, max_depth=None, max_nodes=None, max_chars=None, max_block_chars=None):
+        self.max_depth = max_depth or Config.RENDER_MAX_DEPTH
+        self.max_nodes = max_nodes or Config.RENDER_MAX_NODES
+        self.max_chars = max_chars or Config.RENDER_MAX_CHARS
+        self.max_block_chars = max_block_chars or Config.RENDER_MAX_BLOCK_CHARS
+        self.nodes = 0
+        self.chars = 0
+        self.exhausted = None    # Name of the budget that stopped the walk
+
+
+def format_section_title(section_key):
+    """Format section key to readable title"""
+    return section_key.replace('_', ' ').title()
+
+
+def compile_proposal(proposal_json, proposal_title="Upwork Proposal"):
+    """
+    Compile proposal JSON into a flat tuple of Blocks shared by all renderers.
+
+    Results are memoized by content, so rendering several formats of the same
+    proposal version walks the JSON only once per process.
+    """
+    blocks = [title_block(proposal_title)]
+    for _, section_blocks in compile_sections(proposal_json):
+        blocks.extend(section_blocks)
+    return tuple(blocks)
+
+
+def title_block(proposal_title):
+    """The level-0 heading block for a document title"""
+    return Block(HEADING, 0, proposal_title, None)
+
+
+def compile_sections(proposal_json, budget=None):
+    """
+    Compile each top-level section separately.
+
+    Returns a list of (section_hash, blocks) pairs in document order. The hash
+    covers the section key and content, so renderers can cache per-section
+    output and only rebuild sections that changed. A section cut short by
+    the proposal-wide budget depends on what came before it, so its hash
+    covers the compiled blocks instead.
+    """
+    return _compile(proposal_json, budget)[0]
+
+
+def budget_report(proposal_json, budget=None):
+    """Names of the render budgets this proposal exceeds, in the order they were hit"""
+    return _compile(proposal_json, budget)[1]
+
+
+def clamp_nesting(value, max_nesting=MAX_NESTING):
+    """
+    Return value unchanged if its containers nest at most max_nesting deep,
+    otherwise a copy in which deeper containers are replaced by their text.
+    """
+    if _nesting_within(value, max_nesting):
+        return value
+
+    root = {} if isinstance(value, dict) else []
+    stack = [(value, root, 1)]
+    while stack:
+        source, target, depth = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, item in items:
+            if isinstance(item, (dict, list)):
+                if depth >= max_nesting:
+                    item = _inline_text(item, Config.RENDER_MAX_CHARS)
+                else:
+                    child = {} if isinstance(item, dict) else []
+                    stack.append((item, child, depth + 1))
+                    item = child
+            if isinstance(target, dict):
+                target[key] = item
+            else:
+                target.append(item)
+    return root
+
+
+def _nesting_within(value, max_nesting):
+    stack = [(value, 1)] if isinstance(value, (dict, list)) else []
+    while stack:
+        container, depth = stack.pop()
+        for item in (container.values() if isinstance(container, dict) else container):
+            if isinstance(item, (dict, list)):
+                if depth >= max_nesting:
+                    return False
+                stack.append((item, depth + 1))
+    return True
+
+
+def _compile(proposal_json, budget):
+    proposal_json = clamp_nesting(proposal_json)
+    budget = budget or RenderBudget()
+    sections = []
+    exceeded = []
+    for section_key, content in proposal_json.items():
+        if section_key in SKIPPED_SECTIONS:
+            continue
+        section_hash = _content_key(section_key, content)
+        compiled = _compile_section(section_hash, section_key, content, budget)
+        if budget.exhausted:
+            section_hash = _content_key('compiled', compiled.blocks)
+        sections.append((section_hash, compiled.blocks))
+        exceeded.extend(name for name in compiled.exceeded if name not in exceeded)
+        if budget.exhausted:
+            break
+    return sections, tuple(exceeded)
+
+
+def _compile_section(section_hash, section_key, content, budget):
+    # Flattening depends on the depth limit, so it is part of the memo key
+    memo_key = (section_hash, budget.max_depth)
+    with _memo_lock:
+        compiled = _memo.get(memo_key)
+        if compiled is not None:
+            _memo.move_to_end(memo_key)
+
+    # Reuse a memoized walk only if it fits in what is left of the budget
+    if compiled is not None and (
+        budget.nodes + compiled.nodes <= budget.max_nodes and
+        budget.chars + compiled.chars <= budget.max_chars
+    ):
+        budget.nodes += compiled.nodes
+        budget.chars += compiled.chars
+        return compiled
+
+    nodes_before, chars_before = budget.nodes, budget.chars
+    blocks, exceeded = _walk_section(section_key, content, budget)
+    compiled = _CompiledSection(blocks, budget.nodes - nodes_before, budget.chars - chars_before, exceeded)
+
+    # A walk cut short by the proposal-wide budget depends on earlier sections
+    if not budget.exhausted:
+        with _memo_lock:
+            _memo[memo_key] = compiled
+            while len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+    return compiled
+
+
+def _content_key(*parts):
+    canonical = json.dumps(parts, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _walk_section(section_key, content, budget):
+    """
+    Walk one section depth-first with an explicit stack, so arbitrarily deep
+    input cannot hit the recursion limit. Returns (blocks, exceeded budgets).
+    """
+    blocks = []
+    exceeded = []
+
+    def emit(kind, level, text, label=None):
+        if budget.nodes >= budget.max_nodes:
+            budget.exhausted = NODES_BUDGET
+            return False
+        if len(text) > budget.max_block_chars:
+            # One huge paragraph is very slow to lay out; cut it but keep going
+            text = text[:budget.max_block_chars] + '…'
+            if CHARS_BUDGET not in exceeded:
+                exceeded.append(CHARS_BUDGET)
+        remaining = budget.max_chars - budget.chars - len(label or '')
+        if len(text) > remaining:
+            text = text[:max(remaining, 0)] + '…'
+            budget.exhausted = CHARS_BUDGET
+        blocks.append(Block(kind, level, text, label))
+        budget.nodes += 1
+        budget.chars += len(text) + len(label or '')
+        return not budget.exhausted
+
+    def text_of(value):
+        # Bounded by the remaining character budget; emit() reports the overflow
+        return _inline_text(value, min(budget.max_chars - budget.chars, budget.max_block_chars) + 1)
+
+    stack = []
+    if emit(HEADING, 1, format_section_title(section_key)):
+        if isinstance(content, dict):
+            stack.append((iter(content.items()), 2, True))
+        elif isinstance(content, list):
+            stack.append((iter(content), 1, False))
+        else:
+            emit(PARAGRAPH, 1, text_of(content))
+
+    while stack and not budget.exhausted:
+        entries, level, is_dict = stack[-1]
+        entry = next(entries, _END)
+        if entry is _END:
+            stack.pop()
+            continue
+
+        if not is_dict:
+            emit(BULLET, level, text_of(entry))
+            continue
+
+        key, value = entry
+        if not isinstance(value, (dict, list)):
+            emit(FIELD, level, text_of(value), format_section_title(key))
+        elif level > budget.max_depth:
+            # Too deep to give every key its own heading; flatten to one line
+            if DEPTH_BUDGET not in exceeded:
+                exceeded.append(DEPTH_BUDGET)
+            emit(FIELD, level, text_of(value), format_section_title(key))
+        elif emit(HEADING, level, format_section_title(key)):
+            if isinstance(value, dict):
+                stack.append((iter(value.items()), level + 1, True))
+            else:
+                stack.append((iter(value), level, False))
+
+    if budget.exhausted:
+        if budget.exhausted not in exceeded:
+            exceeded.append(budget.exhausted)
+        blocks.append(Block(
+            TRUNCATED, 1, f'[Content truncated: proposal exceeds the {budget.exhausted} limit]', budget.exhausted
+        ))
+    return tuple(blocks), tuple(exceeded)
+
+
+def _inline_text(value, limit):
+    """
+    str(value) without recursion, stopping once limit characters are produced.
+    Containers are rendered the way str() renders them.
+    """
+    if not isinstance(value, (dict, list)):
+        return str(value)[:limit]
+
+    pieces = []
+    length = 0
+    stack = [_container_tokens(value)]
+    while stack and length < limit:
+        token = next(stack[-1], _END)
+        if token is _END:
+            stack.pop()
+        elif isinstance(token, (dict, list)):
+            stack.append(_container_tokens(token))
+        else:
+            pieces.append(token)
+            length += len(token)
+    return ''.join(pieces)[:limit]
+
+
+def _container_tokens(value):
+    if isinstance(value, dict):
+        yield '{'
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield ', '
+            yield f'{key!r}: '
+            yield item if isinstance(item, (dict, list)) else repr(item)
+        yield '}'
+    else:
+        yield '['
+        for index, item in enumerate(value):
+            if index:
+                yield ', '
+            yield item if isinstance(item, (dict, list)) else repr(item)
+        yield ']'
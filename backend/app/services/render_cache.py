@@ -0,0 +1,244 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from app.services.render_engine import RenderCancelled
+
+
+class _InFlightRender:
+    """A render currently running for a cache key; other callers wait on it"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.data = None
+        self.error = None
+
+
+class RenderCache:
+    """
+    Content-addressed cache for rendered documents.
+
+    Hot entries are kept in an in-process LRU bounded by entry count and
+    total bytes; everything is also written to a size-bounded directory so
+    renders survive restarts and are shared between worker processes.
+    Concurrent requests for the same key are coalesced so only one render runs.
+    """
+
+    def __init__(self, max_entries, max_memory_bytes, disk_dir=None, max_disk_bytes=0):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()      # key -> bytes
+        self._memory_bytes = 0
+        self._disk_index = None           # key -> size, loaded lazily
+        self._disk_bytes = 0
+        self._in_flight = {}              # key -> _InFlightRender
+        self._proposal_keys = {}          # proposal id -> set of keys
+
+    @staticmethod
+    def make_key(fmt, title, json_content, renderer_version, theme='default'):
+        """
+        Build the cache key for a render.
+
+        Key order inside json_content is preserved because section order
+        changes the rendered document.
+        """
+        canonical = json.dumps(
+            {
+                'format': fmt,
+                'title': title,
+                'content': json_content,
+                'renderer': renderer_version,
+                'theme': theme
+            },
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return cached bytes for key, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        data = self._read_disk(key)
+        if data is not None:
+            with self._lock:
+                self._store_memory(key, data)
+        return data
+
+    def put(self, key, data, proposal_id=None):
+        """Store rendered bytes under key"""
+        with self._lock:
+            self._store_memory(key, data)
+            if proposal_id:
+                self._proposal_keys.setdefault(str(proposal_id), set()).add(key)
+        self._write_disk(key, data)
+
+    def get_or_render(self, key, render, proposal_id=None):
+        """
+        Return cached bytes for key, calling render() on a miss.
+
+        If the same key is already being rendered by another thread, wait for
+        that render instead of starting a second one. Exceptions raised by
+        render() are propagated to every waiting caller and nothing is cached,
+        except RenderCancelled: the owner gave up, so a waiter renders instead.
+        """
+        data = self.get(key)
+        if data is not None:
+            if proposal_id:
+                with self._lock:
+                    self._proposal_keys.setdefault(str(proposal_id), set()).add(key)
+            return data
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            owner = in_flight is None
+            if owner:
+                in_flight = _InFlightRender()
+                self._in_flight[key] = in_flight
+
+        if not owner:
+            in_flight.event.wait()
+            if isinstance(in_flight.error, RenderCancelled):
+                return self.get_or_render(key, render, proposal_id)
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.data
+
+        try:
+            data = render()
+            self.put(key, data, proposal_id=proposal_id)
+            in_flight.data = data
+            return data
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.event.set()
+
+    def invalidate_proposal(self, proposal_id):
+        """Drop every entry rendered for a proposal"""
+        with self._lock:
+            keys = self._proposal_keys.pop(str(proposal_id), set())
+            for key in keys:
+                data = self._memory.pop(key, None)
+                if data is not None:
+                    self._memory_bytes -= len(data)
+        for key in keys:
+            self._remove_disk(key)
+
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._proposal_keys.clear()
+
+    def _store_memory(self, key, data):
+        """Insert into the LRU; caller must hold the lock"""
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory and (
+            len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f'{key}.bin')
+
+    def _load_disk_index(self):
+        """Scan the cache directory once, oldest entries first; caller must hold the lock"""
+        if self._disk_index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.disk_dir):
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if not name.endswith('.bin'):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        entries.sort()
+        self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+        self._disk_bytes = sum(self._disk_index.values())
+
+    def _read_disk(self, key):
+        if not self.disk_dir or self.max_disk_bytes <= 0:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._load_disk_index()
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return data
+
+    def _write_disk(self, key, data):
+        if not self.disk_dir or len(data) > self.max_disk_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Render cache write error: {e}")
+            return
+
+        evict = []
+        with self._lock:
+            self._load_disk_index()
+            old_size = self._disk_index.pop(key, None)
+            if old_size is not None:
+                self._disk_bytes -= old_size
+            self._disk_index[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+                old_key, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+                evict.append(old_key)
+        for old_key in evict:
+            self._unlink(old_key)
+
+    def _remove_disk(self, key):
+        if not self.disk_dir:
+            return
+        with self._lock:
+            if self._disk_index is not None:
+                size = self._disk_index.pop(key, None)
+                if size is not None:
+                    self._disk_bytes -= size
+        self._unlink(key)
+
+    def _unlink(self, key):
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
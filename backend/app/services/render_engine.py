@@ -0,0 +1,221 @@
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from app.services import metrics
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# How often a cancellable wait checks whether its render was superseded, in seconds
+CANCEL_POLL_INTERVAL = 0.05
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render engine cannot accept more work"""
+
+    def __init__(self, retry_after):
+        super().__init__('Render queue is full, please retry shortly')
+        self.retry_after = retry_after
+
+
+class RenderTimeout(Exception):
+    """Raised when a render does not finish within the configured timeout"""
+
+
+class RenderCancelled(Exception):
+    """Raised when the caller no longer wants a render, e.g. a superseded live preview"""
+
+
+class RenderCPULimitExceeded(Exception):
+    """Raised inside a worker when a single render uses more CPU than allowed"""
+
+
+def _cpu_seconds_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _raise_cpu_limit(signum, frame):
+    raise RenderCPULimitExceeded('Render exceeded its CPU time limit')
+
+
+def _init_worker(memory_limit):
+    """Apply per-process limits and warm render themes once when a render worker starts"""
+    from app.services.render_themes import warm_themes
+
+    # Workers must not react to the terminal's Ctrl+C; the parent shuts them down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    warm_themes()
+    if resource is None:
+        return
+    if memory_limit:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+
+
+def _builder(fmt, draft):
+    from app.services.document_service import DocumentService
+
+    builders = DocumentService._draft_builders() if draft else DocumentService._builders()
+    return builders[fmt]
+
+
+def _render_in_worker(fmt, proposal_json, proposal_title, theme, cpu_limit, draft=False):
+    """
+    Run a single document build inside a worker process.
+    Returns (result, metric observations) so the parent can record timings.
+    """
+    metrics.start_collection()
+    try:
+        result = _build_with_cpu_limit(_builder(fmt, draft), proposal_json, proposal_title, theme, cpu_limit)
+    finally:
+        observations = metrics.stop_collection()
+    return result, observations
+
+
+def _build_with_cpu_limit(builder, proposal_json, proposal_title, theme, cpu_limit):
+    if resource is None or not cpu_limit:
+        return builder(proposal_json, proposal_title, theme)
+
+    # RLIMIT_CPU counts the whole process, so move the soft limit to
+    # "CPU used so far + budget" for the duration of this render
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    budget = math.ceil(_cpu_seconds_used()) + cpu_limit
+    if hard != resource.RLIM_INFINITY:
+        budget = min(budget, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (budget, hard))
+    try:
+        return builder(proposal_json, proposal_title, theme)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+class RenderEngine:
+    """
+    Runs document builds in a pool of worker processes so reportlab and
+    python-docx layout never hold the GIL of the request-serving process.
+
+    At most max_queue renders may be running or waiting at any time; beyond
+    that callers get RenderQueueFull immediately instead of piling up threads.
+    With workers=0 renders run inline, still subject to the queue bound.
+    """
+
+    def __init__(self, workers, max_queue, timeout, cpu_limit=None, memory_limit=None,
+                 retry_after=2, start_method='spawn'):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.retry_after = retry_after
+        self.start_method = start_method
+
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def render(self, fmt, proposal_json, proposal_title, theme='default', draft=False, timeout=None,
+               cancelled=None):
+        """
+        Build a document and return its bytes, or (bytes, truncated) for
+        draft builds. timeout overrides the engine's default wait.
+        cancelled is an optional threading.Event; once it is set the render
+        is dropped if still queued and the caller gets RenderCancelled.
+        """
+        timeout = timeout or self.timeout
+        if cancelled is not None and cancelled.is_set():
+            raise RenderCancelled('Render was superseded by a newer request')
+        if not self._slots.acquire(blocking=False):
+            raise RenderQueueFull(self.retry_after)
+
+        if self.workers <= 0:
+            try:
+                return _builder(fmt, draft)(proposal_json, proposal_title, theme)
+            finally:
+                self._slots.release()
+
+        pool = self._get_pool()
+        submitted_at = time.perf_counter()
+        try:
+            future = pool.submit(_render_in_worker, fmt, proposal_json, proposal_title, theme, self.cpu_limit, draft)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset_pool(pool)
+            raise
+        # The slot is held until the worker is done, even if the caller gives up waiting
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result, observations = self._wait(future, timeout, cancelled)
+            # Queueing, transfer to the worker and the build itself
+            metrics.observe(metrics.PHASE_METRIC, time.perf_counter() - submitted_at, phase='engine')
+            metrics.replay(observations)
+            return result
+        except FuturesTimeoutError:
+            # A queued render is dropped; a running one is stopped by its CPU limit
+            future.cancel()
+            raise RenderTimeout(f'Render did not finish within {timeout} seconds')
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next render
+            self._reset_pool(pool)
+            raise
+
+    def _wait(self, future, timeout, cancelled):
+        if cancelled is None:
+            return future.result(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled.is_set():
+                # A running build cannot be interrupted; its result is discarded
+                future.cancel()
+                raise RenderCancelled('Render was superseded by a newer request')
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FuturesTimeoutError()
+            try:
+                return future.result(timeout=min(remaining, CANCEL_POLL_INTERVAL))
+            except FuturesTimeoutError:
+                continue
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit,)
+                )
+            return self._pool
+
+    def _reset_pool(self, broken_pool):
+        with self._pool_lock:
+            if self._pool is broken_pool:
+                self._pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+render_engine = RenderEngine(
+    workers=Config.RENDER_ENGINE_WORKERS,
+    max_queue=Config.RENDER_ENGINE_MAX_QUEUE,
+    timeout=Config.RENDER_ENGINE_TIMEOUT,
+    cpu_limit=Config.RENDER_ENGINE_CPU_LIMIT,
+    memory_limit=Config.RENDER_ENGINE_MEMORY_LIMIT,
+    retry_after=Config.RENDER_ENGINE_RETRY_AFTER,
+    start_method=Config.RENDER_ENGINE_START_METHOD
+)
@@ -0,0 +1,198 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from config import Config
+from app.models.render_job import RenderJob, RenderJobStatus
+from app.models.render_job_result import RenderJobResult
+from app.services.document_service import DocumentService
+from app.services.artifact_service import ARTIFACT_CONTENT_TYPES
+from app.services.render_engine import RenderQueueFull
+from app.services.render_themes import DEFAULT_THEME
+
+_executor = ThreadPoolExecutor(
+    max_workers=Config.RENDER_JOB_WORKERS,
+    thread_name_prefix='render-job'
+)
+
+class RenderJobService:
+    """
+    Background document renders tracked as persisted jobs.
+
+    Rendered bytes are stored in GridFS as RenderJobResult and kept until the
+    job expires, so a completed job can always be downloaded. A queued or
+    running job is owned by the process holding its lease (lease_until);
+    jobs whose lease ran out are taken over by resume_pending().
+    """
+
+    _events = {}               # job id -> threading.Event set when the job finishes
+    _lock = threading.Lock()
+    _resumed = False
+
+    @staticmethod
+    def submit(proposal, user, formats, theme=DEFAULT_THEME):
+        """Persist a queued job and hand it to the local worker queue"""
+        RenderJobService.purge_expired()
+        job = RenderJob(
+            proposal=proposal,
+            requested_by=user,
+            formats=formats,
+            theme=theme,
+            lease_until=RenderJobService._new_lease(),
+            expires_at=datetime.utcnow() + timedelta(seconds=Config.RENDER_JOB_TTL)
+        )
+        job.save()
+        RenderJobService._enqueue(str(job.id))
+        return job
+
+    @staticmethod
+    def resume_pending():
+        """
+        Take over jobs left queued or running by a process that is gone (runs
+        once, at startup). Each one is claimed with a conditional update, so
+        with several processes only one picks it up.
+        """
+        with RenderJobService._lock:
+            if RenderJobService._resumed:
+                return
+            RenderJobService._resumed = True
+        try:
+            now = datetime.utcnow()
+            pending = RenderJob.objects(
+                status__in=[RenderJobStatus.QUEUED.value, RenderJobStatus.RUNNING.value]
+            ).only('id', 'lease_until')
+            for job in pending:
+                if job.lease_until and job.lease_until > now:
+                    continue
+                claimed = RenderJob.objects(
+                    id=job.id,
+                    status__in=[RenderJobStatus.QUEUED.value, RenderJobStatus.RUNNING.value],
+                    lease_until=job.lease_until
+                ).update_one(set__lease_until=RenderJobService._new_lease())
+                if claimed:
+                    RenderJobService._enqueue(str(job.id))
+        except Exception as e:
+            print(f"Failed to resume render jobs: {e}")
+
+    @staticmethod
+    def purge_expired():
+        """Delete stored results of expired jobs (MongoDB's TTL monitor does not remove GridFS files)"""
+        try:
+            for result in RenderJobResult.objects(expires_at__lt=datetime.utcnow()):
+                result.file.delete()
+                result.delete()
+        except Exception as e:
+            print(f"Failed to purge expired render job results: {e}")
+
+    @staticmethod
+    def wait(job, timeout):
+        """Wait up to timeout seconds for a job to finish and return its latest state"""
+        if job.is_finished or timeout <= 0:
+            return job
+
+        with RenderJobService._lock:
+            event = RenderJobService._events.get(str(job.id))
+
+        deadline = time.monotonic() + timeout
+        if event is not None:
+            # Job is running in this process; wake up as soon as it finishes
+            event.wait(timeout)
+        else:
+            # Job belongs to another process; poll its persisted state
+            while time.monotonic() < deadline:
+                time.sleep(0.5)
+                job.reload()
+                if job.is_finished:
+                    return job
+        job.reload()
+        return job
+
+    @staticmethod
+    def open_result(job, fmt):
+        """A readable file with the rendered bytes of a completed job format, or None once expired"""
+        result = RenderJobResult.objects(job=job, format=fmt, expires_at__gt=datetime.utcnow()).first()
+        if not result:
+            return None
+        return result.file.get()
+
+    @staticmethod
+    def _new_lease():
+        return datetime.utcnow() + timedelta(seconds=Config.RENDER_JOB_LEASE)
+
+    @staticmethod
+    def _renew_lease(job_id):
+        RenderJob.objects(id=job_id).update_one(set__lease_until=RenderJobService._new_lease())
+
+    @staticmethod
+    def _enqueue(job_id):
+        with RenderJobService._lock:
+            RenderJobService._events.setdefault(job_id, threading.Event())
+        _executor.submit(RenderJobService._run, job_id)
+
+    @staticmethod
+    def _run(job_id):
+        """Worker entry point: render every requested format and record the outcome"""
+        try:
+            job = RenderJob.objects(id=job_id).first()
+            if not job or job.is_finished:
+                return
+
+            job.status = RenderJobStatus.RUNNING.value
+            job.save()
+
+            expires_at = datetime.utcnow() + timedelta(seconds=Config.RENDER_JOB_TTL)
+            try:
+                proposal = job.proposal
+                results = {}
+                for fmt in job.formats:
+                    data = RenderJobService._render_with_retry(job_id, fmt, proposal, job.theme)
+                    RenderJobService._store_result(job, fmt, data, expires_at)
+                    results[fmt] = {'size': len(data)}
+                job.results = results
+                job.status = RenderJobStatus.COMPLETED.value
+            except Exception as e:
+                print(f"Render job {job_id} failed: {e}")
+                job.status = RenderJobStatus.FAILED.value
+                job.error = str(e)
+
+            job.expires_at = expires_at
+            job.lease_until = None
+            job.save()
+        except Exception as e:
+            print(f"Render job {job_id} error: {e}")
+        finally:
+            with RenderJobService._lock:
+                event = RenderJobService._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    @staticmethod
+    def _store_result(job, fmt, data, expires_at):
+        """Persist rendered bytes until the job expires, replacing those of an earlier attempt"""
+        for old in RenderJobResult.objects(job=job, format=fmt):
+            old.file.delete()
+            old.delete()
+        result = RenderJobResult(job=job, format=fmt, size=len(data), expires_at=expires_at)
+        result.file.put(BytesIO(data), content_type=ARTIFACT_CONTENT_TYPES[fmt])
+        result.save()
+
+    @staticmethod
+    def _render_with_retry(job_id, fmt, proposal, theme):
+        """Render through the engine, waiting out backpressure instead of failing the job"""
+        deadline = time.monotonic() + Config.RENDER_JOB_TTL
+        while True:
+            # Keep the job ours while it waits and renders
+            RenderJobService._renew_lease(job_id)
+            try:
+                return DocumentService.render_bytes(
+                    fmt,
+                    proposal.json_content,
+                    proposal.title,
+                    proposal_id=proposal.id,
+                    theme=theme
+                )
+            except RenderQueueFull as e:
+                if time.monotonic() + e.retry_after > deadline:
+                    raise
+                time.sleep(e.retry_after)
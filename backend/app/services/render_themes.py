@@ -0,0 +1,217 @@
+import json
+import threading
+from docx import Document
+from docx.shared import Inches, RGBColor
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from config import Config
+from app.services.docx_writer import DocxPackage
+
+DEFAULT_THEME = 'default'
+
+PAGE_SIZES = {
+    'A4': A4,
+    'letter': letter
+}
+
+
+class RenderTheme:
+    """
+    Visual settings for rendered proposals.
+
+    PDF paragraph styles are built once per theme. Word documents are rendered
+    into a per-thread base document that already carries the theme's margins
+    and resolved style handles; its body is reset after each render instead of
+    re-parsing the default template every time. The streaming Word writer uses
+    a package captured once from such a base document (see docx_package()).
+    """
+
+    def __init__(self, name, primary_color='#1f4788', secondary_color='#2c5aa0',
+                 title_font_size=20, heading_font_size=14, subheading_font_size=12,
+                 margin_inches=1.0, page_size='A4', color_word_headings=False):
+        if page_size not in PAGE_SIZES:
+            raise ValueError(f"Unknown page size: {page_size}")
+        self.name = name
+        self.primary_color = primary_color
+        self.secondary_color = secondary_color
+        self.title_font_size = title_font_size
+        self.heading_font_size = heading_font_size
+        self.subheading_font_size = subheading_font_size
+        self.margin_inches = margin_inches
+        self.page_size = page_size
+        self.color_word_headings = color_word_headings
+
+        self._pdf_styles = None
+        self._pdf_lock = threading.Lock()
+        self._word_bases = threading.local()
+        self._docx_package = None
+        self._docx_lock = threading.Lock()
+
+    @property
+    def pdf_page_size(self):
+        return PAGE_SIZES[self.page_size]
+
+    @property
+    def pdf_margin(self):
+        return self.margin_inches * 72
+
+    def pdf_styles(self):
+        """Return the theme's PDF paragraph styles, building them on first use"""
+        if self._pdf_styles is None:
+            with self._pdf_lock:
+                if self._pdf_styles is None:
+                    self._pdf_styles = self._build_pdf_styles()
+        return self._pdf_styles
+
+    def word_base(self):
+        """
+        Return this thread's base Word document with an empty body.
+        Callers must finish with reset_word_base() once the document is saved.
+        """
+        base = getattr(self._word_bases, 'base', None)
+        if base is None:
+            base = self._build_word_base()
+            self._word_bases.base = base
+        return base
+
+    def reset_word_base(self):
+        """Strip the body of this thread's base document back to its section settings"""
+        base = getattr(self._word_bases, 'base', None)
+        if base is None:
+            return
+        body = base.document.element.body
+        for child in list(body):
+            if child.tag != _SECT_PR_TAG:
+                body.remove(child)
+
+    def docx_package(self):
+        """Return the theme's static Word package parts for the streaming writer, capturing them on first use"""
+        if self._docx_package is None:
+            with self._docx_lock:
+                if self._docx_package is None:
+                    self._docx_package = DocxPackage.from_base(self._build_word_base())
+        return self._docx_package
+
+    def discard_word_base(self):
+        """Drop this thread's base document, e.g. after a failed render"""
+        self._word_bases.base = None
+
+    def _build_pdf_styles(self):
+        styles = getSampleStyleSheet()
+        return {
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=self.title_font_size,
+                spaceAfter=30,
+                alignment=1,  # Center aligned
+                textColor=HexColor(self.primary_color)
+            ),
+            'heading': ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=self.heading_font_size,
+                spaceAfter=12,
+                spaceBefore=20,
+                textColor=HexColor(self.primary_color)
+            ),
+            'subheading': ParagraphStyle(
+                'CustomSubheading',
+                parent=styles['Heading3'],
+                fontSize=self.subheading_font_size,
+                spaceAfter=8,
+                spaceBefore=12,
+                textColor=HexColor(self.secondary_color)
+            ),
+            'body': styles['BodyText']
+        }
+
+    def _build_word_base(self):
+        doc = Document()
+
+        for section in doc.sections:
+            section.top_margin = Inches(self.margin_inches)
+            section.bottom_margin = Inches(self.margin_inches)
+            section.left_margin = Inches(self.margin_inches)
+            section.right_margin = Inches(self.margin_inches)
+
+        styles = doc.styles
+        handles = {
+            'title': styles['Title'],
+            'heading': styles['Heading 1'],
+            'subheading': styles['Heading 2'],
+            'bullet': styles['List Bullet']
+        }
+        if self.color_word_headings:
+            primary = RGBColor.from_string(self.primary_color.lstrip('#'))
+            handles['title'].font.color.rgb = primary
+            handles['heading'].font.color.rgb = primary
+            handles['subheading'].font.color.rgb = RGBColor.from_string(self.secondary_color.lstrip('#'))
+
+        return _WordBase(doc, handles)
+
+
+class _WordBase:
+    """A parsed Word document plus style handles resolved against it"""
+
+    def __init__(self, document, styles):
+        self.document = document
+        self.styles = styles
+
+
+_SECT_PR_TAG = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}sectPr'
+
+_themes = {}
+_themes_lock = threading.Lock()
+
+
+def register_theme(theme):
+    """Add or replace a theme in the registry"""
+    with _themes_lock:
+        _themes[theme.name] = theme
+    return theme
+
+
+def get_theme(name=None):
+    """Look up a theme by name; raises ValueError for unknown themes"""
+    theme = _themes.get(name or DEFAULT_THEME)
+    if theme is None:
+        raise ValueError(f"Unknown render theme: {name}")
+    return theme
+
+
+def theme_names():
+    return sorted(_themes)
+
+
+def warm_themes():
+    """Build styles and base documents for every theme ahead of the first render"""
+    for theme in list(_themes.values()):
+        theme.pdf_styles()
+        theme.word_base()
+        if Config.DOCX_WRITER == 'stream':
+            theme.docx_package()
+
+
+def load_themes_file(path):
+    """
+    Register custom themes from a JSON file: a list of objects with a "name"
+    plus any RenderTheme keyword arguments, e.g.
+    [{"name": "acme", "primary_color": "#c0392b", "margin_inches": 0.75}]
+    """
+    with open(path) as f:
+        definitions = json.load(f)
+    for definition in definitions:
+        definition = dict(definition)
+        definition.setdefault('color_word_headings', True)
+        register_theme(RenderTheme(**definition))
+
+
+register_theme(RenderTheme(DEFAULT_THEME))
+
+if Config.RENDER_THEMES_FILE:
+    try:
+        load_themes_file(Config.RENDER_THEMES_FILE)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Failed to load render themes from {Config.RENDER_THEMES_FILE}: {e}")
@@ -0,0 +1,56 @@
+import threading
+
+
+class Renderer:
+    """
+    A registered output format.
+
+    build(proposal_json, proposal_title, theme) returns the document bytes.
+    Renderers with uses_engine=True are heavy (reportlab, python-docx) and run
+    in render engine worker processes behind the render cache; the others
+    are cheap enough to build inline on the request thread.
+    """
+
+    def __init__(self, name, build, content_type, extension, uses_engine=False):
+        self.name = name
+        self.build = build
+        self.content_type = content_type
+        self.extension = extension
+        self.uses_engine = uses_engine
+
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def register_renderer(renderer):
+    """Add or replace a renderer in the registry"""
+    with _renderers_lock:
+        _renderers[renderer.name] = renderer
+    return renderer
+
+
+def get_renderer(name):
+    """Look up a renderer by format name; raises ValueError for unknown formats"""
+    renderer = _renderers.get(name)
+    if renderer is None:
+        raise ValueError(f"Unsupported document format: {name}")
+    return renderer
+
+
+def renderer_names():
+    """Registered format names in registration order"""
+    return list(_renderers)
+
+
+def negotiate_renderer(accept_mimetypes):
+    """
+    Pick the registered renderer that best matches a request's Accept header,
+    preferring earlier registrations on ties. Returns None if nothing matches.
+    A request without an Accept header gets the first registered renderer.
+    """
+    if not accept_mimetypes:
+        return next(iter(_renderers.values()), None)
+    by_type = {renderer.content_type: renderer for renderer in _renderers.values()}
+    content_type = accept_mimetypes.best_match(list(by_type))
+    return by_type.get(content_type)
@@ -0,0 +1,71 @@
+import json
+
+
+class SectionParser:
+    """
+    Incremental parser for a JSON object that arrives in pieces, such as a
+    streamed LLM completion. feed() returns the top-level (key, value)
+    members completed by the new text, in order, so each proposal section
+    can be shown before the rest of the object has been generated.
+
+    Text before the opening brace and after the closing one (e.g. a ```json
+    fence) is ignored. A member that is not valid JSON is skipped.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member = []
+
+    def feed(self, text):
+        """Consume more text and return the members it completed"""
+        sections = []
+        for char in text:
+            if self.complete:
+                break
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+
+            # A comma between members or the object's closing brace ends a member
+            if (self._depth == 1 and char == ',') or self._depth == 0:
+                section = self._finish_member()
+                if section is not None:
+                    sections.append(section)
+                self.complete = self._depth == 0
+                continue
+            self._member.append(char)
+        return sections
+
+    def _finish_member(self):
+        text = ''.join(self._member).strip()
+        self._member = []
+        if not text:
+            return None
+        try:
+            member = json.loads('{' + text + '}')
+        except ValueError:
+            return None
+        return next(iter(member.items()), None)
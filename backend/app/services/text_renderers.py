@@ -0,0 +1,92 @@
+from html import escape
+from app.services.proposal_ir import compile_proposal, HEADING, FIELD, BULLET, TRUNCATED
+
+# Cheap text renderers built straight from the proposal IR. The theme argument
+# is accepted for a uniform renderer signature but has no effect on text output.
+
+
+def build_html(proposal_json, proposal_title, theme=None):
+    """Standalone HTML document"""
+    parts = [
+        '<!DOCTYPE html>',
+        '<html>',
+        '<head>',
+        '<meta charset="utf-8">',
+        f'<title>{escape(proposal_title)}</title>',
+        '</head>',
+        '<body>'
+    ]
+    in_list = False
+    for block in compile_proposal(proposal_json, proposal_title):
+        if block.kind == BULLET:
+            if not in_list:
+                parts.append('<ul>')
+                in_list = True
+            parts.append(f'<li>{escape(block.text)}</li>')
+            continue
+        if in_list:
+            parts.append('</ul>')
+            in_list = False
+
+        if block.kind == HEADING:
+            level = min(block.level + 1, 6)
+            parts.append(f'<h{level}>{escape(block.text)}</h{level}>')
+        elif block.kind == FIELD:
+            parts.append(f'<p><strong>{escape(block.label)}:</strong> {escape(block.text)}</p>')
+        elif block.kind == TRUNCATED:
+            parts.append(f'<p><em>{escape(block.text)}</em></p>')
+        else:
+            parts.append(f'<p>{escape(block.text)}</p>')
+    if in_list:
+        parts.append('</ul>')
+    parts.extend(['</body>', '</html>', ''])
+    return '\n'.join(parts).encode('utf-8')
+
+
+def build_markdown(proposal_json, proposal_title, theme=None):
+    """Markdown, e.g. for pasting into editors that understand it"""
+    lines = []
+    previous = None
+    for block in compile_proposal(proposal_json, proposal_title):
+        # Consecutive bullets form one list; everything else is its own paragraph
+        if lines and not (block.kind == BULLET and previous == BULLET):
+            lines.append('')
+
+        if block.kind == HEADING:
+            lines.append(f"{'#' * min(block.level + 1, 6)} {block.text}")
+        elif block.kind == FIELD:
+            lines.append(f'**{block.label}:** {block.text}')
+        elif block.kind == BULLET:
+            lines.append(f'- {block.text}')
+        elif block.kind == TRUNCATED:
+            lines.append(f'*{block.text}*')
+        else:
+            lines.append(block.text)
+        previous = block.kind
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def build_text(proposal_json, proposal_title, theme=None):
+    """Plain text for pasting straight into the Upwork proposal box"""
+    lines = []
+    previous = None
+    for block in compile_proposal(proposal_json, proposal_title):
+        if lines and not (block.kind == BULLET and previous == BULLET):
+            lines.append('')
+
+        if block.kind == HEADING and block.level == 0:
+            lines.extend([block.text.upper(), '=' * len(block.text)])
+        elif block.kind == HEADING and block.level == 1:
+            lines.extend([block.text, '-' * len(block.text)])
+        elif block.kind == HEADING:
+            lines.append(f'{block.text}:')
+        elif block.kind == FIELD:
+            lines.append(f'{block.label}: {block.text}')
+        elif block.kind == BULLET:
+            lines.append(f'• {block.text}')
+        else:
+            lines.append(block.text)
+        previous = block.kind
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
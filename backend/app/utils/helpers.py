@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+from datetime import timezone
+from flask import request, Response, send_file
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+
+
+def make_etag(*parts):
+    """Strong entity tag from the values that determine a response body"""
+    canonical = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:40]
+
+
+def proposal_etag(proposal, *variant):
+    """
+    Entity tag for a response derived from one proposal.
+    variant distinguishes different representations (format, theme, view).
+    """
+    updated_at = proposal.updated_at.isoformat() if proposal.updated_at else None
+    return make_etag(proposal.id, proposal.current_version, updated_at, *variant)
+
+
+def collection_etag(proposals, *variant):
+    """
+    Entity tag for a list of proposals. Pass a queryset restricted with
+    .only('id', 'current_version', 'updated_at') so the validator is computed
+    without loading full documents. Lists get no Last-Modified because
+    removing a proposal does not advance any timestamp.
+    """
+    return make_etag(*variant, *(proposal_etag(proposal) for proposal in proposals))
+
+
+def not_modified(etag, last_modified=None, weak=False):
+    """
+    Return a 304 response if the request's If-None-Match or If-Modified-Since
+    header matches, otherwise None. Call before rendering or serializing.
+    """
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matched = _http_date(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return add_validators(Response(status=304), etag, last_modified, weak)
+
+
+def add_validators(response, etag, last_modified=None, weak=False):
+    """
+    Attach ETag/Last-Modified and ask clients to revalidate before reuse.
+    A weak ETag marks a body that is equivalent but not byte-identical across
+    renders.
+    """
+    response.set_etag(etag, weak=weak)
+    if last_modified:
+        response.last_modified = _http_date(last_modified)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def send_document(buffer, etag=None, last_modified=None, weak=False, **kwargs):
+    """
+    send_file for a seekable document body (rendered spool or stored
+    artifact) with Content-Length and byte-range support. Validators are
+    attached before ranges are evaluated so If-Range can be honoured; a
+    document with a weak ETag is always sent whole. An error document
+    (render_error set) gets no validators and is not stored, so clients
+    fetch the real document once rendering works again.
+    kwargs are passed to send_file.
+    """
+    buffer.seek(0, os.SEEK_END)
+    size = buffer.tell()
+    buffer.seek(0)
+
+    response = send_file(buffer, conditional=False, **kwargs)
+    response.document = buffer  # For hooks that need to know when the body is done, see on_file_close()
+    response.content_length = size
+    ranges = not weak
+    if ranges:
+        response.accept_ranges = 'bytes'
+    if getattr(buffer, 'render_error', None):
+        response.cache_control.no_store = True
+    elif etag:
+        add_validators(response, etag, last_modified, weak)
+    try:
+        return response.make_conditional(request.environ, accept_ranges=ranges, complete_length=size)
+    except RequestedRangeNotSatisfiable as e:
+        response.close()
+        return e.get_response()
+
+
+def on_file_close(file, callback):
+    """
+    Run callback once after file.close(). The WSGI server closes a response
+    body file when it has sent it, whether through its file wrapper
+    (sendfile) or by iterating it, so this observes the end of sending
+    without replacing the body iterable.
+    """
+    close = file.close
+    called = []
+
+    def close_and_notify():
+        try:
+            close()
+        finally:
+            if not called:
+                called.append(True)
+                callback()
+
+    file.close = close_and_notify
+
+
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _http_date(value):
+    """Stored timestamps are naive UTC; HTTP dates have one-second resolution"""
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
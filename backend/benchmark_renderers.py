@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Render micro-benchmarks for the proposal document renderers.
+
+Builds synthetic proposals of configurable shape, renders them with every
+registered DocumentService format, and reports latency percentiles, peak RSS
+and output size per format. Every case also checks that two independent
+renders of the same proposal are byte-identical (deterministic output).
+Each case runs in a fresh interpreter so peak RSS is not polluted by other
+cases. Runs fully offline; no database or API keys are needed.
+
+    python benchmark_renderers.py                      # compare with baselines
+    python benchmark_renderers.py --save-baseline      # record new baselines
+    python benchmark_renderers.py --scenario large --format pdf
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import subprocess
+
+# Render inline in the benchmark process instead of through worker processes
+os.environ.setdefault('RENDER_ENGINE_WORKERS', '0')
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+
+# sections, nesting depth, list length, words per text value
+SCENARIOS = {
+    'small': {'sections': 5, 'depth': 2, 'list_length': 3, 'words': 40},
+    'medium': {'sections': 12, 'depth': 3, 'list_length': 8, 'words': 120},
+    'large': {'sections': 30, 'depth': 4, 'list_length': 20, 'words': 300}
+}
+
+FORMATS = ('pdf', 'docx', 'html', 'markdown', 'text')
+
+WORDS = (
+    'project delivery client scope milestone testing deployment design review '
+    'integration quality support timeline budget requirement feature analysis '
+    'communication documentation performance security maintenance experience'
+).split()
+
+
+def synthetic_proposal(sections, depth, list_length, words, seed=0):
+    """Deterministic proposal JSON with the given shape"""
+    rng = random.Random(seed)
+
+    def text():
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def node(level):
+        if level >= depth:
+            return text()
+        return {
+            'summary': text(),
+            'items': [text()[:80] for _ in range(list_length)],
+            'details': node(level + 1)
+        }
+
+    proposal = {}
+    for index in range(sections):
+        proposal[f'section_{index + 1}'] = text() if index % 4 == 0 else node(1)
+    return proposal
+
+
+def _render_function(fmt):
+    from io import BytesIO
+    from app.services.document_service import DocumentService
+
+    if fmt == 'pdf':
+        return lambda proposal_json: DocumentService.generate_pdf_document(proposal_json, 'Benchmark Proposal')
+    if fmt == 'docx':
+        return lambda proposal_json: DocumentService.generate_word_document(proposal_json, 'Benchmark Proposal')
+    # Text formats are built inline and never cached
+    return lambda proposal_json: BytesIO(DocumentService.render_bytes(fmt, proposal_json, 'Benchmark Proposal'))
+
+
+def _clear_render_caches():
+    """Drop in-process memoization so every iteration measures a full render"""
+    from app.services import proposal_ir
+    from app.services.document_service import fragment_cache
+    with proposal_ir._memo_lock:
+        proposal_ir._memo.clear()
+    fragment_cache.clear()
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(case):
+    """Run one format/scenario case in this process and return its measurements"""
+    import time
+    import resource
+
+    proposal_json = synthetic_proposal(seed=case['seed'], **case['shape'])
+    render = _render_function(case['format'])
+
+    for _ in range(case['warmup']):
+        render(proposal_json)
+
+    timings = []
+    size = 0
+    for _ in range(case['iterations']):
+        if not case['warm']:
+            _clear_render_caches()
+        start = time.perf_counter()
+        output = render(proposal_json)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(output.getvalue())
+
+    # Rendered documents are content-addressed, so a repeat render must match exactly
+    _clear_render_caches()
+    deterministic = render(proposal_json).getvalue() == output.getvalue()
+
+    timings.sort()
+    return {
+        'p50_ms': round(_percentile(timings, 0.50), 2),
+        'p90_ms': round(_percentile(timings, 0.90), 2),
+        'p99_ms': round(_percentile(timings, 0.99), 2),
+        'max_ms': round(timings[-1], 2),
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'size_bytes': size,
+        'deterministic': deterministic
+    }
+
+
+def _run_case_subprocess(case):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark case failed:\n{result.stderr}")
+    # Renderers may print; the measurements are always the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baselines, threshold):
+    """Return regression messages for measurements worse than baseline by more than threshold"""
+    regressions = []
+    for case_id, measured in results.items():
+        baseline = baselines.get(case_id)
+        if not baseline:
+            continue
+        for metric in ('p50_ms', 'p90_ms', 'peak_rss_mb', 'size_bytes'):
+            if metric not in baseline or not baseline[metric]:
+                continue
+            change = (measured[metric] - baseline[metric]) / baseline[metric]
+            if change > threshold:
+                regressions.append(
+                    f"{case_id} {metric}: {baseline[metric]} -> {measured[metric]} (+{change:.0%})"
+                )
+    return regressions
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark proposal document renderers')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS) + ['custom'],
+                        help='Scenario to run (repeatable, default: all presets)')
+    parser.add_argument('--format', action='append', choices=FORMATS, dest='formats',
+                        help='Format to run (repeatable, default: all)')
+    parser.add_argument('--sections', type=int, default=10, help='Sections for the custom scenario')
+    parser.add_argument('--depth', type=int, default=3, help='Nesting depth for the custom scenario')
+    parser.add_argument('--list-length', type=int, default=5, help='List length for the custom scenario')
+    parser.add_argument('--words', type=int, default=100, help='Words per text value for the custom scenario')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed renders per case')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed renders per case')
+    parser.add_argument('--warm', action='store_true',
+                        help='Keep section caches between iterations (measures incremental re-renders)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline-file', default=DEFAULT_BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed regression over baseline as a fraction (default: 0.25)')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    scenarios = args.scenario or sorted(SCENARIOS)
+    shapes = dict(SCENARIOS)
+    shapes['custom'] = {
+        'sections': args.sections,
+        'depth': args.depth,
+        'list_length': args.list_length,
+        'words': args.words
+    }
+
+    results = {}
+    print(f"{'case':<20} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rss MB':>8} {'bytes':>9} {'stable':>7}")
+    for scenario in scenarios:
+        for fmt in args.formats or FORMATS:
+            case_id = f'{scenario}/{fmt}'
+            measured = _run_case_subprocess({
+                'format': fmt,
+                'shape': shapes[scenario],
+                'seed': args.seed,
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'warm': args.warm
+            })
+            results[case_id] = measured
+            print(f"{case_id:<20} {measured['p50_ms']:>9} {measured['p90_ms']:>9} {measured['p99_ms']:>9} "
+                  f"{measured['max_ms']:>9} {measured['peak_rss_mb']:>8} {measured['size_bytes']:>9} "
+                  f"{'yes' if measured['deterministic'] else 'NO':>7}")
+
+    unstable = [case_id for case_id, measured in results.items() if not measured['deterministic']]
+    if unstable:
+        print(f"\n❌ Output differs between identical renders: {', '.join(unstable)}")
+        return 1
+
+    if args.save_baseline:
+        baselines = {}
+        if os.path.exists(args.baseline_file):
+            with open(args.baseline_file) as f:
+                baselines = json.load(f)
+        baselines.update(results)
+        with open(args.baseline_file, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\n✅ Baselines saved to {args.baseline_file}")
+        return 0
+
+    if not os.path.exists(args.baseline_file):
+        print(f"\nNo baselines at {args.baseline_file}; run with --save-baseline to record them")
+        return 0
+
+    with open(args.baseline_file) as f:
+        baselines = json.load(f)
+    regressions = compare(results, baselines, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
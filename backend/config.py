@@ -17,7 +17,84 @@ class Config:
     
     # GROQ API
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY') or 'your-groq-api-key'
+    GROQ_BASE_URL = os.environ.get('GROQ_BASE_URL')  # Defaults to the Groq API; point at a fake server for testing
+    GROQ_MODEL = os.environ.get('GROQ_MODEL') or 'llama3-70b-8192'
+    GROQ_CONNECT_TIMEOUT = float(os.environ.get('GROQ_CONNECT_TIMEOUT') or 5)  # Seconds
+    GROQ_READ_TIMEOUT = float(os.environ.get('GROQ_READ_TIMEOUT') or 60)  # Seconds
+    GROQ_MAX_CONNECTIONS = int(os.environ.get('GROQ_MAX_CONNECTIONS') or 20)  # Pooled keep-alive connections per process
+    GROQ_MAX_RETRIES = int(os.environ.get('GROQ_MAX_RETRIES') or 3)  # Retries on 429/5xx and connection errors
+    GROQ_BACKOFF_BASE = float(os.environ.get('GROQ_BACKOFF_BASE') or 0.5)  # Seconds, doubled per retry with full jitter
+    GROQ_BACKOFF_MAX = float(os.environ.get('GROQ_BACKOFF_MAX') or 8)  # Seconds
+    GROQ_BREAKER_THRESHOLD = int(os.environ.get('GROQ_BREAKER_THRESHOLD') or 5)  # Failed calls before failing fast
+    GROQ_BREAKER_RESET = float(os.environ.get('GROQ_BREAKER_RESET') or 30)  # Seconds before trying the provider again
+    GROQ_REQUESTS_PER_MINUTE = int(os.environ.get('GROQ_REQUESTS_PER_MINUTE') or 30)  # Per process; 0 disables the limit
+    GROQ_TOKENS_PER_MINUTE = int(os.environ.get('GROQ_TOKENS_PER_MINUTE') or 6000)  # Per process; 0 disables the limit
+    GROQ_DEADLINE = float(os.environ.get('GROQ_DEADLINE') or 120)  # Seconds a call may wait for the API before using mock content
+    
+    # Proposal generation cache
+    GENERATION_CACHE_TTL = int(os.environ.get('GENERATION_CACHE_TTL') or 7 * 24 * 60 * 60)  # Seconds a generated template is reused
+    GENERATION_CACHE_ENTRIES = int(os.environ.get('GENERATION_CACHE_ENTRIES') or 256)  # Templates kept in process memory
+
+    # Background proposal generation
+    GENERATION_WORKERS = int(os.environ.get('GENERATION_WORKERS') or 8)  # Concurrent LLM generations per process
+    GENERATION_LEASE = int(os.environ.get('GENERATION_LEASE') or 10 * 60)  # Seconds before another process may take over a generation
     
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or '/tmp/uploads'
\ No newline at end of file
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or '/tmp/uploads'
+
+    # Render cache
+    RENDER_CACHE_MAX_ENTRIES = int(os.environ.get('RENDER_CACHE_MAX_ENTRIES') or 128)
+    RENDER_CACHE_MAX_MEMORY = int(os.environ.get('RENDER_CACHE_MAX_MEMORY') or 64 * 1024 * 1024)  # 64MB
+    RENDER_CACHE_DIR = os.environ.get('RENDER_CACHE_DIR') or os.path.join(UPLOAD_FOLDER, 'render_cache')
+    RENDER_CACHE_MAX_DISK = int(os.environ.get('RENDER_CACHE_MAX_DISK') or 512 * 1024 * 1024)  # 512MB
+    RENDER_FRAGMENT_CACHE_ENTRIES = int(os.environ.get('RENDER_FRAGMENT_CACHE_ENTRIES') or 2048)  # Rendered sections per process
+    DOCX_WRITER = os.environ.get('DOCX_WRITER', 'stream')  # 'stream' (direct XML) or 'python-docx'
+    RENDER_DETERMINISTIC = os.environ.get('RENDER_DETERMINISTIC', 'true').lower() == 'true'  # Byte-identical PDF/DOCX for identical content
+
+    # Render budgets for untrusted proposal content
+    RENDER_MAX_DEPTH = int(os.environ.get('RENDER_MAX_DEPTH') or 8)  # Deepest heading level; deeper values are flattened
+    RENDER_MAX_NODES = int(os.environ.get('RENDER_MAX_NODES') or 5000)  # Headings, fields and bullets per document
+    RENDER_MAX_CHARS = int(os.environ.get('RENDER_MAX_CHARS') or 500000)  # Text characters per document
+    RENDER_MAX_BLOCK_CHARS = int(os.environ.get('RENDER_MAX_BLOCK_CHARS') or 20000)  # Characters per paragraph
+    RENDER_MAX_PAGES = int(os.environ.get('RENDER_MAX_PAGES') or 100)  # PDF pages laid out
+
+    # Approved proposal artifacts
+    ARTIFACT_RENDER_WORKERS = int(os.environ.get('ARTIFACT_RENDER_WORKERS') or 2)
+
+    # Render engine (worker processes for PDF/DOCX layout)
+    RENDER_ENGINE_WORKERS = int(os.environ.get('RENDER_ENGINE_WORKERS') or min(4, os.cpu_count() or 1))
+    RENDER_ENGINE_MAX_QUEUE = int(os.environ.get('RENDER_ENGINE_MAX_QUEUE') or 16)  # Running + waiting renders
+    RENDER_ENGINE_TIMEOUT = float(os.environ.get('RENDER_ENGINE_TIMEOUT') or 30)  # Seconds
+    RENDER_ENGINE_CPU_LIMIT = int(os.environ.get('RENDER_ENGINE_CPU_LIMIT') or 20)  # CPU seconds per render
+    RENDER_ENGINE_MEMORY_LIMIT = int(os.environ.get('RENDER_ENGINE_MEMORY_LIMIT') or 1024 * 1024 * 1024)  # 1GB per worker
+    RENDER_ENGINE_RETRY_AFTER = int(os.environ.get('RENDER_ENGINE_RETRY_AFTER') or 2)  # Seconds
+    RENDER_ENGINE_START_METHOD = os.environ.get('RENDER_ENGINE_START_METHOD') or 'spawn'
+
+    # Asynchronous render jobs
+    RENDER_JOB_WORKERS = int(os.environ.get('RENDER_JOB_WORKERS') or 2)
+    RENDER_JOB_TTL = int(os.environ.get('RENDER_JOB_TTL') or 60 * 60)  # Seconds a finished job is kept
+    RENDER_JOB_MAX_WAIT = int(os.environ.get('RENDER_JOB_MAX_WAIT') or 25)  # Longest long-poll, in seconds
+    RENDER_JOB_LEASE = int(os.environ.get('RENDER_JOB_LEASE') or 5 * 60)  # Seconds before another process may take over a job
+
+    # Document responses
+    RENDER_SPOOL_MAX_MEMORY = int(os.environ.get('RENDER_SPOOL_MAX_MEMORY') or 1024 * 1024)  # 1MB per document before spilling to disk
+    RENDER_INFLIGHT_MAX_BYTES = int(os.environ.get('RENDER_INFLIGHT_MAX_BYTES') or 256 * 1024 * 1024)  # 256MB of unsent documents per process
+    
+    # Render themes
+    RENDER_THEMES_FILE = os.environ.get('RENDER_THEMES_FILE')  # Optional JSON list of custom themes
+
+    # Bulk export
+    EXPORT_RENDER_CONCURRENCY = int(os.environ.get('EXPORT_RENDER_CONCURRENCY') or 4)  # Documents rendered at once
+
+    # Portfolio books
+    PORTFOLIO_MAX_PROPOSALS = int(os.environ.get('PORTFOLIO_MAX_PROPOSALS') or 50)
+
+    # Draft previews (?quality=draft)
+    PREVIEW_DRAFT_SECTIONS = int(os.environ.get('PREVIEW_DRAFT_SECTIONS') or 3)  # Leading sections rendered
+    PREVIEW_DRAFT_PAGES = int(os.environ.get('PREVIEW_DRAFT_PAGES') or 2)  # PDF pages laid out
+    PREVIEW_DRAFT_LAYOUT_BUDGET = float(os.environ.get('PREVIEW_DRAFT_LAYOUT_BUDGET') or 1.5)  # Seconds of PDF layout
+    PREVIEW_DRAFT_TIMEOUT = float(os.environ.get('PREVIEW_DRAFT_TIMEOUT') or 5)  # Seconds before giving up
+
+    # Metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token required by /metrics when set
\ No newline at end of file
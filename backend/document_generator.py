@@ -1,122 +1,246 @@
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from io import BytesIO
+#!/usr/bin/env python3
+"""
+Offline batch renderer for proposal documents.
+
+Reads proposals from an NDJSON export (one proposal object per line, as
+written by mongoexport) or straight from MongoDB, renders them in parallel
+across worker processes and writes <proposal id>.<ext> files to a directory.
+Files that already exist are skipped, so an interrupted run resumes where it
+stopped; files are written atomically, never half-finished.
+
+    python document_generator.py --ndjson proposals.ndjson --out renders/
+    python document_generator.py --mongo --status approved --format pdf --format docx --out renders/
+    python document_generator.py --mongo --theme acme --workers 8 --out renders-acme/
+
+The generate_*_document functions are the legacy entry points; rendering
+lives in DocumentService's renderer registry so they match the API output.
+"""
+
+import os
+import sys
 import json
+import time
+import signal
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from app.services.document_service import DocumentService
+from app.services.renderer_registry import get_renderer, renderer_names
+from app.services.render_themes import DEFAULT_THEME, theme_names
+
+PROGRESS_INTERVAL = 5  # Seconds between progress lines
+
 
 def generate_word_document(proposal_json):
     """
     Generate Word document from proposal JSON
     """
-    try:
-        doc = Document()
-        
-        # Add title
-        title = doc.add_heading('Upwork Proposal', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add sections from JSON
-        for section, content in proposal_json.items():
-            if isinstance(content, dict):
-                # Handle nested objects
-                doc.add_heading(section.title().replace('_', ' '), level=1)
-                for subsection, subcontent in content.items():
-                    doc.add_heading(subsection.title().replace('_', ' '), level=2)
-                    if isinstance(subcontent, dict):
-                        for key, value in subcontent.items():
-                            p = doc.add_paragraph()
-                            p.add_run(f"{key.title().replace('_', ' ')}: ").bold = True
-                            p.add_run(str(value))
-                    else:
-                        doc.add_paragraph(str(subcontent))
-            else:
-                doc.add_heading(section.title().replace('_', ' '), level=1)
-                doc.add_paragraph(str(content))
-        
-        # Save to buffer
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        
-        return buffer
-        
-    except Exception as e:
-        print(f"Word generation error: {e}")
-        # Return empty document on error
-        doc = Document()
-        doc.add_paragraph("Error generating document")
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+    return DocumentService.generate_word_document(proposal_json)
 
 def generate_pdf_document(proposal_json):
     """
     Generate PDF document from proposal JSON
     """
+    return DocumentService.generate_pdf_document(proposal_json)
+
+
+def read_ndjson(path):
+    """Yield (proposal id, title, json_content) from an NDJSON export; bad lines yield an error string"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('expected a JSON object')
+                proposal_id = record.get('id') or record.get('_id')
+                if isinstance(proposal_id, dict):
+                    proposal_id = proposal_id.get('$oid')  # mongoexport extended JSON
+                if not proposal_id or not isinstance(record.get('json_content'), dict):
+                    raise ValueError('expected "_id" and an object "json_content"')
+            except ValueError as e:
+                yield None, None, f'line {line_number}: {e}'
+                continue
+            yield str(proposal_id), record.get('title') or 'Upwork Proposal', record['json_content']
+
+
+def read_mongo(statuses, batch_size):
+    """Yield (proposal id, title, json_content) from MongoDB through a server-side cursor"""
+    from mongoengine import connect
+    from app.models.proposal import Proposal
+
+    connect(host=Config.MONGODB_URI, alias='default')
+    proposals = Proposal.objects(status__in=statuses) if statuses else Proposal.objects
+    cursor = proposals.only('id', 'title', 'json_content').no_cache().batch_size(batch_size)
+    for proposal in cursor:
+        yield str(proposal.id), proposal.title, proposal.json_content
+
+
+def output_path(out_dir, proposal_id, fmt):
+    return os.path.join(out_dir, f'{proposal_id}.{get_renderer(fmt).extension}')
+
+
+def _init_worker():
+    """Workers leave Ctrl+C to the parent and warm themes once"""
+    from app.services.render_themes import warm_themes
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    warm_themes()
+
+
+def render_proposal(proposal_id, title, json_content, formats, theme, out_dir):
+    """Render one proposal to each missing format; returns (bytes written, seconds)"""
+    started = time.perf_counter()
+    written = 0
+    for fmt in formats:
+        path = output_path(out_dir, proposal_id, fmt)
+        if os.path.exists(path):
+            continue
+        data = DocumentService.build_bytes(fmt, json_content, title, theme)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        written += len(data)
+    return written, time.perf_counter() - started
+
+
+class BatchStats:
+    """Counters and throughput for a batch run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rendered = 0
+        self.skipped = 0
+        self.failed = []
+        self.bytes_written = 0
+        self.render_seconds = 0.0
+        self.interrupted = False
+        self._last_report = self.started
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        rate = self.rendered / elapsed if elapsed else 0
+        line = (f"{'Done' if final else 'Progress'}: {self.rendered} rendered, {self.skipped} skipped, "
+                f"{len(self.failed)} failed in {elapsed:.1f}s ({rate:.1f} proposals/s, "
+                f"{self.bytes_written / elapsed / (1024 * 1024) if elapsed else 0:.2f} MB/s)")
+        if final and self.rendered:
+            line += f", {self.render_seconds / self.rendered * 1000:.0f} ms render time per proposal"
+        print(line)
+        self._last_report = time.perf_counter()
+
+    def maybe_report(self):
+        if time.perf_counter() - self._last_report >= PROGRESS_INTERVAL:
+            self.report()
+
+
+def run_batch(proposals, formats, theme, out_dir, workers, limit=None):
+    """Render proposals with a bounded window of in-flight work; returns BatchStats"""
+    stats = BatchStats()
+    pending = {}
+    # Keep a few proposals per worker queued so no process idles between results
+    window = workers * 4
+
+    def collect(futures):
+        for future in futures:
+            proposal_id = pending.pop(future)
+            try:
+                written, seconds = future.result()
+                stats.rendered += 1
+                stats.bytes_written += written
+                stats.render_seconds += seconds
+            except Exception as e:
+                stats.failed.append((proposal_id, str(e)))
+                print(f"❌ {proposal_id}: {e}")
+        stats.maybe_report()
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(Config.RENDER_ENGINE_START_METHOD),
+        initializer=_init_worker
+    )
     try:
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center aligned
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        content = []
-        
-        # Add title
-        content.append(Paragraph('Upwork Proposal', title_style))
-        content.append(Spacer(1, 20))
-        
-        # Add sections from JSON
-        for section, section_content in proposal_json.items():
-            content.append(Paragraph(section.title().replace('_', ' '), heading_style))
-            
-            if isinstance(section_content, dict):
-                for subsection, subcontent in section_content.items():
-                    content.append(Paragraph(subsection.title().replace('_', ' '), styles['Heading3']))
-                    if isinstance(subcontent, dict):
-                        for key, value in subcontent.items():
-                            content.append(Paragraph(
-                                f"<b>{key.title().replace('_', ' ')}:</b> {value}",
-                                styles['BodyText']
-                            ))
-                    else:
-                        content.append(Paragraph(str(subcontent), styles['BodyText']))
-            else:
-                content.append(Paragraph(str(section_content), styles['BodyText']))
-            
-            content.append(Spacer(1, 12))
-        
-        doc.build(content)
-        buffer.seek(0)
-        
-        return buffer
-        
-    except Exception as e:
-        print(f"PDF generation error: {e}")
-        # Return error message PDF
-        buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        c.drawString(100, 700, "Error generating PDF document")
-        c.save()
-        buffer.seek(0)
-        return buffer
\ No newline at end of file
+        submitted = 0
+        for proposal_id, title, json_content in proposals:
+            if proposal_id is None:
+                stats.failed.append(('input', json_content))
+                print(f"❌ Skipping unreadable input, {json_content}")
+                continue
+            if all(os.path.exists(output_path(out_dir, proposal_id, fmt)) for fmt in formats):
+                stats.skipped += 1
+                continue
+            if limit is not None and submitted >= limit:
+                break
+
+            future = executor.submit(render_proposal, proposal_id, title, json_content, formats, theme, out_dir)
+            pending[future] = proposal_id
+            submitted += 1
+            if len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    except KeyboardInterrupt:
+        print("\nInterrupted; finished files are kept and the next run resumes from them")
+        stats.interrupted = True
+        executor.shutdown(wait=False, cancel_futures=True)
+        return stats
+    executor.shutdown()
+    return stats
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Render proposal documents in bulk')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ndjson', help='NDJSON export with _id, title and json_content per line')
+    source.add_argument('--mongo', action='store_true', help='Read proposals from MONGODB_URI')
+    parser.add_argument('--status', action='append', help='Only proposals with this status (repeatable, --mongo only)')
+    parser.add_argument('--out', required=True, help='Output directory')
+    parser.add_argument('--format', action='append', dest='formats', choices=renderer_names(),
+                        help='Format to render (repeatable, default: pdf)')
+    parser.add_argument('--theme', default=DEFAULT_THEME, help='Render theme (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Render processes (default: number of CPUs)')
+    parser.add_argument('--limit', type=int, help='Render at most this many proposals')
+    parser.add_argument('--batch-size', type=int, default=200, help='MongoDB cursor batch size')
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+
+    if args.theme not in theme_names():
+        print(f"❌ Unknown theme. Must be one of: {theme_names()}")
+        return 2
+    formats = args.formats or ['pdf']
+    os.makedirs(args.out, exist_ok=True)
+
+    if args.ndjson:
+        proposals = read_ndjson(args.ndjson)
+    else:
+        proposals = read_mongo(args.status, args.batch_size)
+
+    print(f"Rendering {', '.join(formats)} with theme '{args.theme}' on {args.workers} workers into {args.out}")
+    stats = run_batch(proposals, formats, args.theme, args.out, max(1, args.workers), args.limit)
+
+    stats.report(final=True)
+    if stats.interrupted:
+        return 130
+    if stats.failed:
+        print(f"❌ {len(stats.failed)} proposal(s) failed; rerun to retry them")
+        return 1
+    print("✅ All proposals rendered")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Settings are read when config is imported, so set them before any app import.
+# Renders run inline so the test process's fragment cache is the one in use.
+os.environ.setdefault('RENDER_ENGINE_WORKERS', '0')
+os.environ.setdefault('RENDER_CACHE_DIR', tempfile.mkdtemp(prefix='render-cache-'))
+os.environ.setdefault('RENDER_DETERMINISTIC', 'true')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+import pytest
+from app.services.document_service import DocumentService, render_cache, fragment_cache
+
+PROPOSAL_ID = 'deterministic-output'
+PROPOSAL = {
+    "introduction": "Thank you for posting this project.",
+    "understanding": "You need a REST API for an inventory system, with tests.",
+    "proposed_solution": {
+        "approach": "Iterative delivery with weekly demos",
+        "phases": ["Discovery", "API design", "Implementation", "Testing"]
+    },
+    "timeline": {"development": "2 weeks", "testing": "3 days"},
+    "budget": {"total": "$2,000", "payment_terms": "Milestones"},
+    "questions": ["Which database do you use?", "Is there an existing API?"]
+}
+
+
+def render_cold(fmt):
+    """Render with nothing cached from an earlier render"""
+    render_cache.invalidate_proposal(PROPOSAL_ID)
+    fragment_cache.clear()
+    return DocumentService.render_bytes(fmt, PROPOSAL, 'Inventory API', proposal_id=PROPOSAL_ID)
+
+
+@pytest.mark.parametrize('fmt', ['pdf', 'docx'])
+def test_rendering_twice_gives_identical_bytes(fmt):
+    first = render_cold(fmt)
+    second = render_cold(fmt)
+
+    assert first
+    assert first == second